@@ -6,16 +6,22 @@
 import sys
 import os.path
 import copy
+import glob
+import multiprocessing
 from pathlib import Path
 import json
 
 import Config
+import Ingest
+import ListItem
+import Loader
 import Optimizer
 import ListWidget
 import PlotViewer
 import DataFile
 import Process
 import Cursor
+import Storage
 
 import pyqtgraph as pg
 import pandas as pd
@@ -54,7 +60,11 @@ class CSViewerWindow(QtWidgets.QMainWindow):
         # Viewer handles the plotting section
         viewer = QtWidgets.QVBoxLayout()
         self.plot = PlotViewer.PlotViewer(self)
-        self.plot.plt.vb.sigRangeChanged.connect(self.recalculateDownsampling)
+        # view changes are handled at most once per frame
+        self.rangeProxy = pg.SignalProxy(self.plot.plt.vb.sigRangeChanged,
+             rateLimit=Config.FRAME_RATE, slot=self.recalculateDownsampling)
+        self.resizeProxy = pg.SignalProxy(self.plot.plt.vb.sigResized,
+             rateLimit=Config.FRAME_RATE, slot=self.recalculateDownsampling)
         self.plotProxy = pg.SignalProxy(self.plot.plt.scene().sigMouseMoved,
              rateLimit=60, slot=self.cursorUpdate)
         viewer.addLayout(self.plot.layout)
@@ -83,6 +93,11 @@ class CSViewerWindow(QtWidgets.QMainWindow):
         self.addNew.setCursor(QtGui.QCursor(QtCore.Qt.PointingHandCursor))
         self.toolbar.addWidget(self.addNew)
 
+        self.addBatchBtn = QtWidgets.QPushButton(QtGui.QIcon(Config.getResource("assets/add_new.png")), "Stapel")
+        self.addBatchBtn.clicked.connect(self.openBatchDialog)
+        self.addBatchBtn.setCursor(QtGui.QCursor(QtCore.Qt.PointingHandCursor))
+        self.toolbar.addWidget(self.addBatchBtn)
+
         self.addProcessBtn = QtWidgets.QPushButton(QtGui.QIcon(Config.getResource("assets/add_process.png")), "Prozess")
         self.addProcessBtn.clicked.connect(self.addProcess)
         self.addProcessBtn.setCursor(QtGui.QCursor(QtCore.Qt.PointingHandCursor))
@@ -142,9 +157,10 @@ class CSViewerWindow(QtWidgets.QMainWindow):
 
         self.show()
 
-    def recalculateDownsampling(self):
+    # redraws the data of the series in view, styles stay untouched
+    def recalculateDownsampling(self, evt=None):
         for item in self.fileList.list:
-            item.updatePlot()
+            item.updateView()
 
     # disable context menu
     def createPopupMenu(self):
@@ -291,6 +307,53 @@ class CSViewerWindow(QtWidgets.QMainWindow):
             self.plot.addPlot(df)
             self.reorder()
 
+    # imports many files with one column mapping like "x = Zeit, y = Messung"
+    # filenames may contain glob patterns
+    def batchImport(self, filenames, mapping, list=None):
+        if not list:
+            list = self.fileList
+
+        columns = Loader.parseMapping(mapping)
+        if not columns:
+            self.__showError("Ungültige Zuordnung",
+                "<p>Die Zuordnung muss die Form <i>x = Spalte, y = Spalte</i> haben.</p>")
+            return
+
+        paths = []
+        for filename in filenames:
+            paths.extend(sorted(glob.glob(filename)) or [filename])
+
+        config = ListItem.defaultConfig(None)
+        config["xColumn"], config["yColumn"] = columns
+
+        dlg = pg.ProgressDialog("Importieren", cancelText=None, busyCursor=True, disable=False, wait=250)
+        dlg.setValue(0)
+        results, errors = Loader.loadBatch(paths, config, progress=lambda p: dlg.setValue(int(p * 100)))
+        dlg.setValue(100)
+
+        items = []
+        for path in paths:
+            if path not in results:
+                continue
+
+            color = getColor(self.fileList.getCount() + len(items))
+            result = results[path]
+            result["config"]["color"] = color
+
+            df = DataFile.DataFile(path, color, config=result["config"], result=result)
+            self.__connectListItem(df)
+            items.append(df)
+
+        # one notification for the whole batch
+        list.addItems(items)
+        for df in items:
+            self.plot.addPlot(df)
+        self.reorder()
+
+        if errors:
+            self.__showError("Nicht alle Dateien konnten importiert werden",
+                "".join("<p>{}: {}</p>".format(os.path.basename(f), e) for f, e in errors.items()))
+
     def addCursor(self):
         c = Cursor.Cursor(getColor(self.fileList.getCount()))
         self.fileList.addItem(c)
@@ -326,14 +389,34 @@ class CSViewerWindow(QtWidgets.QMainWindow):
     def openFileNameDialog(self):
         options = QtWidgets.QFileDialog.Options()
         filename, filetype = QtWidgets.QFileDialog.getOpenFileName(self, "Datei Hinzufügen", "",
-                    "CSV Dateien (*.csv);;CSViewer Datei (*.csviewer);;JSON Dateien (*.json);;Alle Dateinen (*)", options=options)
+                    "CSV Dateien (*.csv *.csv.gz *.csv.xz *.csv.bz2);;CSViewer Datei (*.csviewer);;JSON Dateien (*.json);;Alle Dateinen (*)", options=options)
 
         if filename:
-            if filetype == "CSV Dateien (*.csv)":
+            if filetype == "CSV Dateien (*.csv *.csv.gz *.csv.xz *.csv.bz2)":
                 self.addFile(df=self.__createFile(filename))
             elif filetype == "CSViewer Datei (*.csviewer)" or filetype == "JSON Dateien (*.json)":
                 self.load(filename)
 
+    # prompts user for several files and a common column mapping
+    def openBatchDialog(self):
+        options = QtWidgets.QFileDialog.Options()
+        filenames, _ = QtWidgets.QFileDialog.getOpenFileNames(self, "Dateien Hinzufügen", "",
+                    "CSV Dateien (*.csv *.csv.gz *.csv.xz *.csv.bz2);;Alle Dateinen (*)", options=options)
+
+        if not filenames:
+            return
+
+        # suggest the first two columns of the first file
+        head = Ingest.readHead(filenames[0])
+        header = Ingest.readPreview(head, *Ingest.sniff(head)).columns.values.tolist()
+        mapping = "x = {}, y = {}".format(header[0], header[min(1, len(header) - 1)])
+
+        mapping, ok = QtWidgets.QInputDialog.getText(self, "Stapelimport",
+                    "Zuordnung der Spalten für alle Dateien:", text=mapping)
+
+        if ok:
+            self.batchImport(filenames, mapping)
+
     # prompts user for save-file location and saves data
     def save(self):
         options = QtWidgets.QFileDialog.Options()
@@ -379,7 +462,8 @@ class CSViewerWindow(QtWidgets.QMainWindow):
                     data["containing"]["config"]["color"],
                     config=data["containing"]["config"]
                 )
-                d.data = pd.DataFrame(data["containing"]["data"])
+                # used if the original file is gone or can't be loaded anymore
+                d.setEmbeddedData(Storage.ColumnStore.fromFrame(pd.DataFrame(data["containing"]["data"])))
                 self.__connectListItem(d)
 
                 parentList.addItem(d)
@@ -399,6 +483,23 @@ class CSViewerWindow(QtWidgets.QMainWindow):
                 self.load_recursive(data["containing"]["children"], p.fileList)
 
 
+    def __showError(self, title, message):
+        error_dialog = QtWidgets.QMessageBox()
+
+        with open(Config.getResource("assets/style.qss"), "r") as fh:
+            error_dialog.setStyleSheet(fh.read())
+
+        error_dialog.setIcon(QtWidgets.QMessageBox.Warning)
+        error_dialog.setWindowTitle("Error")
+        error_dialog.setText(title)
+        error_dialog.setInformativeText(message)
+        error_dialog.setStandardButtons(QtWidgets.QMessageBox.Ok)
+
+        for button in error_dialog.buttons():
+            button.setCursor(QtGui.QCursor(QtCore.Qt.PointingHandCursor))
+
+        error_dialog.exec_()
+
     # shows info box
     def showInfo(self):
         msgBox = QtWidgets.QMessageBox()
@@ -428,6 +529,8 @@ class CSViewerWindow(QtWidgets.QMainWindow):
 # ----------------------------------- main ----------------------------------- #
 
 if __name__ == "__main__":
+    # batch imports run on a process pool, which needs this in frozen mode
+    multiprocessing.freeze_support()
 
     # set paths for frozen mode
     root = Path()
@@ -0,0 +1,174 @@
+# Cache.py
+# by Robin Prillwitz
+# 18.10.2026
+#
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+
+import numpy as np
+
+import Config
+
+
+# every parsed file gets its own cache directory
+# the name is derived from everything that influences the parsed result
+def key(filename, sep, decimal):
+    stat = os.stat(filename)
+    identity = json.dumps([
+        os.path.abspath(filename),
+        stat.st_size,
+        stat.st_mtime_ns,
+        sep,
+        decimal
+    ])
+    return hashlib.sha1(identity.encode("utf-8")).hexdigest()
+
+def __directory(filename, sep, decimal):
+    return os.path.join(Config.CACHE_DIR, key(filename, sep, decimal))
+
+def __readMeta(directory):
+    try:
+        with open(os.path.join(directory, "meta.json"), "r") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {"columns": {}}
+
+# columns are cached separately for every storage type
+def __entry(column, dtype):
+    return "{}@{}".format(column, np.dtype(dtype).name)
+
+# the file of a column is named after its entry, so concurrent writers never pick the same name for different columns
+# column names may contain anything, so the name is hashed
+def __fileName(entry):
+    return hashlib.sha1(entry.encode("utf-8")).hexdigest() + ".npy"
+
+# returns the requested columns memory mapped from the cache
+# or None if any of them has not been cached yet
+# dtypes maps columns to their storage type, float64 by default
+def load(filename, columns, sep, decimal, dtypes=None):
+    if not Config.CACHE:
+        return None
+
+    try:
+        directory = __directory(filename, sep, decimal)
+    except OSError:
+        return None
+
+    data = {}
+    for column in dict.fromkeys(columns):
+        name = __fileName(__entry(column, (dtypes or {}).get(column, np.float64)))
+
+        try:
+            data[column] = np.load(os.path.join(directory, name), mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+
+    # the modification time of a directory marks its last use for the eviction
+    try:
+        os.utime(directory)
+    except OSError:
+        pass
+
+    return data
+
+# whether a cached column is sorted in ascending order, None if that isn't known
+def isSorted(filename, column, sep, decimal):
+    if not Config.CACHE:
+        return None
+
+    try:
+        return __readMeta(__directory(filename, sep, decimal)).get("sorted", {}).get(column)
+    except OSError:
+        return None
+
+# writes columns as raw .npy files next to a small json index
+# failing to write the cache is never fatal, the data is just parsed again next time
+def store(filename, data, sep, decimal):
+    if not Config.CACHE:
+        return
+
+    try:
+        directory = __directory(filename, sep, decimal)
+        os.makedirs(directory, exist_ok=True)
+
+        meta = __readMeta(directory)
+        meta["filename"] = os.path.abspath(filename)
+        meta["seperator"] = sep
+        meta["decimal"] = decimal
+
+        for column, values in data.items():
+            entry = __entry(column, values.dtype)
+            name = __fileName(entry)
+
+            # write to a temporary file of its own first, so a half written column is never loaded
+            fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=directory)
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    np.save(fh, np.ascontiguousarray(values))
+                os.replace(tmp, os.path.join(directory, name))
+            except OSError:
+                os.remove(tmp)
+                raise
+
+            meta["columns"][entry] = name
+            # checked once here, so loading from the cache doesn't have to read the whole column
+            meta.setdefault("sorted", {})[column] = bool(np.all(values[1:] >= values[:-1]))
+
+        fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=directory)
+        with os.fdopen(fd, "w") as fh:
+            json.dump(meta, fh)
+        os.replace(tmp, os.path.join(directory, "meta.json"))
+
+        evict(directory)
+    except OSError:
+        pass
+
+def __size(directory):
+    size = 0
+    for entry in os.scandir(directory):
+        try:
+            size += entry.stat().st_size
+        except OSError:
+            pass
+    return size
+
+# removes outdated and least recently used cache directories
+# directories of older versions of the same file are always removed,
+# the others once the cache grows beyond Config.CACHE_SIZE
+# the directory just written is kept in any case
+def evict(keep=None):
+    try:
+        directories = [entry.path for entry in os.scandir(Config.CACHE_DIR) if entry.is_dir()]
+    except OSError:
+        return
+
+    current = __readMeta(keep) if keep else {}
+    used = []
+    for directory in directories:
+        if directory == keep:
+            continue
+
+        meta = __readMeta(directory)
+        if current.get("filename") and all(meta.get(k) == current.get(k) for k in ("filename", "seperator", "decimal")):
+            shutil.rmtree(directory, ignore_errors=True)
+            continue
+
+        try:
+            used.append((os.stat(directory).st_mtime, directory))
+        except OSError:
+            pass
+
+    total = sum(__size(directory) for _, directory in used)
+    if keep:
+        total += __size(keep)
+
+    # least recently used first
+    for _, directory in sorted(used):
+        if total <= Config.CACHE_SIZE:
+            break
+        total -= __size(directory)
+        shutil.rmtree(directory, ignore_errors=True)
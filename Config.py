@@ -31,6 +31,56 @@ PPD = 100
 PRECISION = 8
 # max ammount of sampling points for datafiles only
 MAX = 2000
+# numeric integration method, "simpson" or "trapez"
+INTEGRATION = "simpson"
+# storage type of y values, "float32" halves memory and bandwidth of large series
+# x values always stay float64
+DTYPE = "float64"
+
+# polynomial order of the Savitzky-Golay filter
+SAVGOL_ORDER = 3
+# order of the Butterworth filter
+BUTTER_ORDER = 4
+
+# rows of a file shown in the column selection dialog
+PREVIEW_ROWS = 20
+# bytes read from the start of a file to detect its format
+SNIFF_BYTES = 16384
+# rows parsed at once when streaming a file
+CHUNKSIZE = 100000
+
+# samples combined per level of the min/max pyramid used for drawing
+PYRAMID_FACTOR = 4
+
+# rate at which dragging and scrubbing update the display [Hz]
+FRAME_RATE = 60
+
+# refresh rate of followed files [Hz]
+TAIL_RATE = 10
+# samples before appended data a spline is fit to when following a file
+TAIL_CONTEXT = 16
+
+# worker processes for batch imports, None uses all cores
+WORKERS = None
+# worker threads resampling the children of a Process, None uses all cores
+THREADS = None
+
+# bytes of fitted splines kept for resampling the children of a Process
+INTERPOLANT_BYTES = 512 * 1024**2
+
+# incremental updates of a Process before its children are combined from scratch again
+# limits the rounding errors that add up with every update
+RECOMBINE_INTERVAL = 50
+
+# non-uniform Process grids: regions with their own sample density and the maximum amount of samples
+GRID_REGIONS = 256
+GRID_MAX = 1000000
+
+# keep parsed columns as binary files, so files don't have to be parsed twice
+CACHE = True
+CACHE_DIR = str(Path.home() / ".csviewer" / "cache")
+# bytes the cache may grow to before the least recently used files are removed
+CACHE_SIZE = 4 * 1024**3
 
 def getResource(path):
     if getattr(sys, 'frozen', False):
@@ -9,7 +9,6 @@ from pathlib import Path
 from PyQt5 import QtGui, QtCore, QtWidgets
 import pyqtgraph as pg
 
-import pandas as pd
 import numpy as np
 from scipy import integrate
 from scipy.interpolate import interp1d
@@ -27,6 +26,7 @@ class Cursor(ListItem.ListItem):
 
         del self.plot
         self.plot = pg.InfiniteLine(angle=0, movable=True)
+        self.plotPen = False
 
         self.recalculate()
         self.updatePlot()
@@ -88,44 +88,43 @@ class Cursor(ListItem.ListItem):
 
     # applies all calculations and interpolation
     def recalculate(self):
-        self.modData = pd.DataFrame({"x": [0,0.0001], "y": [self.config["yOffset"],self.config["yOffset"]]})
-        self.interpData = pd.DataFrame({"x": [0,0.0001], "y": [self.config["yOffset"],self.config["yOffset"]]})
+        self.modData = ListItem.placeholder(self.config["yOffset"], 0.0001)
+        self.interpData = ListItem.placeholder(self.config["yOffset"], 0.0001)
+        self.version += 1
         if self.sigCalc:
             self.sigCalc.emit()
 
-    def updatePlot(self):
-        # Calculate all colors
-        color = QtGui.QColor()
-        color.setHsvF(  self.config["color"][0] / 360,
-                        self.config["color"][1] / 100,
-                        self.config["color"][2] / 100)
-        pen = pg.mkPen(color=color, width=self.config["width"])
+    # a horizontal line doesn't depend on the view
+    def updateView(self):
+        pass
 
-        highlightColor = QtGui.QColor()
-        highlightColor.setHsvF( self.config["color"][0] / 360,
-                                self.config["color"][1] / 100,
-                                self.config["color"][2] / 100, 0.2)
-        highlightPen = pg.mkPen(color=highlightColor, width=self.config["width"] * 4 + 10)
+    def updateStyle(self):
+        style = ListItem.styles(tuple(self.config["color"]), self.config["width"])
 
-        self.cursor.setPen(pg.mkPen(color=(0, 0, 0, 0), width=0))
+        if self.cursorPen is not style["hiddenPen"]:
+            self.cursorPen = style["hiddenPen"]
+            self.cursor.setPen(self.cursorPen)
 
         if not self.config["enabled"]:
-                self.plot.setPen(None)
+            pen = None
+        elif self.config["highlight"]:
+            pen = style["highlightPen"]
         else:
-            if self.config["highlight"]:
-                self.plot.setPen(highlightPen)
-                # self.plot.setData(pen=None, symbolPen=pen, symbolBrush=highlightColor, shadowPen=None)
-            else:
-                self.plot.setPen(pen)
+            pen = style["pen"]
 
+        if pen is not self.plotPen:
+            self.plotPen = pen
+            self.plot.setPen(pen)
+
+        if self.config["enabled"]:
             # set respective z indecies
             if self.config["highlight"]:
-                # self.cursor.setZValue(Config.Z_IDX_TOP)
                 self.plot.setZValue(Config.Z_IDX_TOP)
             else:
-                # self.cursor.setZValue(self.config["zIndex"])
                 self.plot.setZValue(self.config["zIndex"])
 
+    def updatePlot(self):
+        self.updateStyle()
         self.plot.setValue(self.config["yOffset"])
 
     def updateUI(self):
@@ -145,7 +144,7 @@ class Cursor(ListItem.ListItem):
 
     def setZIndex(self, zIndex):
         self.config["zIndex"] = zIndex
-        self.updatePlot()
+        self.updateStyle()
         return zIndex - 1
 
     def toDict(self):
@@ -12,32 +12,54 @@ import pyqtgraph as pg
 import pandas as pd
 import numpy as np
 from scipy import integrate
-from scipy.interpolate import interp1d
 from scipy.ndimage.filters import gaussian_filter1d
 
 import Config
+import Filter
+import Ingest
 import ListItem
+import Loader
+import Pipeline
+import Storage
 
 
 # Handles one data file and its processing
 # inherits from QWidget to emit signals
 class DataFile(ListItem.ListItem):
 
-    def __init__(self, filename, color, config=None, parent=None):
+    # result can hold data that has already been loaded, e.g. by a batch import
+    def __init__(self, filename, color, config=None, parent=None, result=None):
         super().__init__(color, config=config, parent=parent)
         self.filename = filename
+        self.data = Storage.ColumnStore()
+        self.loading = False
+        self.loadSignals = None
+        # data saved with a session, used if the file itself can't be loaded
+        self.embedded = None
+
+        # live tail of a file that is still being written
+        self.config.setdefault("follow", False)
+        self.tailOffset = 0
+        self.tailBuffers = None
+        self.tailState = None
+        self.tailTimer = QtCore.QTimer()
+        self.tailTimer.timeout.connect(self.__tail)
 
         self.__initSettings()
         self.__showListItem()
 
         self.__readData()
 
-        if self.config["xColumn"] == -1 or self.config["yColumn"] == -1:
+        if result is not None:
+            self.__setResult(result)
+        elif self.config["xColumn"] == -1 or self.config["yColumn"] == -1:
             self.__selectData()
+        else:
+            self.__loadData()
 
-        self.recalculate()
         self.updatePlot()
 
+        self.__setFollow(self.config["follow"])
         self.__toggleSettings()
 
     def __copy__(self):
@@ -69,6 +91,14 @@ class DataFile(ListItem.ListItem):
         self.Hlayout.addWidget(self.label)
         self.Hlayout.addStretch(1)
 
+        # shown while the file is loaded in the background
+        self.progressBar = QtWidgets.QProgressBar()
+        self.progressBar.setRange(0, 100)
+        self.progressBar.setTextVisible(False)
+        self.progressBar.setFixedWidth(60)
+        self.progressBar.hide()
+        self.Hlayout.addWidget(self.progressBar)
+
         self.settingsBtn = QtWidgets.QPushButton(QtGui.QIcon(Config.getResource("assets/left.png")), "")
         self.settingsBtn.clicked.connect(self.__toggleSettings)
         self.settingsBtn.setFlat(True)
@@ -102,7 +132,7 @@ class DataFile(ListItem.ListItem):
         self.x_offset.setRange(-9999, 9999)
         self.x_offset.setValue(self.config["xOffset"])
         # self.x_offset.setFixedWidth(75)
-        self.x_offset.valueChanged.connect(lambda x, who="xOffset": self.applyChange(x, who))
+        self.connectOffset(self.x_offset, "xOffset")
         self.x_offset_label = QtWidgets.QLabel("x-Offset:")
         self.x_offset_label.setBuddy(self.x_offset)
         self.x_offset_label.setAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
@@ -111,7 +141,7 @@ class DataFile(ListItem.ListItem):
         self.y_offset.setRange(-9999, 9999)
         self.y_offset.setValue(self.config["yOffset"])
         # self.y_offset.setFixedWidth(75)
-        self.y_offset.valueChanged.connect(lambda y, who="yOffset": self.applyChange(y, who))
+        self.connectOffset(self.y_offset, "yOffset")
         self.y_offset_label = QtWidgets.QLabel("y-Offset:")
         self.y_offset_label.setBuddy(self.y_offset)
         self.y_offset_label.setAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
@@ -162,12 +192,40 @@ class DataFile(ListItem.ListItem):
         self.filterLabel.setBuddy(self.integrationBox)
         self.filterLabel.setAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
 
+        # Filter kernel
+        self.filterTypeBox = QtWidgets.QComboBox()
+        self.filterTypeBox.addItems(list(Filter.FILTERS.keys()))
+        self.filterTypeBox.setCurrentText(self.config["filterType"])
+        self.filterTypeBox.currentTextChanged.connect(lambda x, who="filterType": self.applyChange(x, who))
+        self.filterTypeLabel = QtWidgets.QLabel("Filterart:")
+        self.filterTypeLabel.setBuddy(self.filterTypeBox)
+        self.filterTypeLabel.setAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+
+        # Precision
+        self.precisionBox = QtWidgets.QComboBox()
+        self.precisionBox.addItems(["float64", "float32"])
+        self.precisionBox.setCurrentText(self.config["precision"])
+        self.precisionBox.currentTextChanged.connect(self.__setPrecision)
+        self.precisionLabel = QtWidgets.QLabel("Genauigkeit:")
+        self.precisionLabel.setBuddy(self.precisionBox)
+        self.precisionLabel.setAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+
+        # Follow
+        self.followBox = QtWidgets.QCheckBox()
+        self.followBox.setChecked(self.config["follow"])
+        self.followBox.setCursor(QtGui.QCursor(QtCore.Qt.PointingHandCursor))
+        self.followBox.stateChanged.connect(self.__setFollow)
+        # compressed archives can't be appended to
+        self.followBox.setDisabled(Ingest.isCompressed(self.filename))
+        self.followLabel = QtWidgets.QLabel("Verfolgen:")
+        self.followLabel.setBuddy(self.followBox)
+        self.followLabel.setAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+
         self.reassignBtn = QtWidgets.QPushButton("Umbesetzen")
         self.reassignBtn.setCursor(QtGui.QCursor(QtCore.Qt.PointingHandCursor))
         self.reassignBtn.clicked.connect(lambda _: [
             self.__readData(),
-            self.__selectData(),
-            self.update()
+            self.__selectData()
         ])
 
         self.GLayout.addWidget(self.x_offset_label,              0, 0)
@@ -186,11 +244,19 @@ class DataFile(ListItem.ListItem):
 
         self.GLayout.addWidget(self.filterLabel,                 5, 0)
         self.GLayout.addWidget(self.filterBox,                   5, 1)
+        self.GLayout.addWidget(self.filterTypeLabel,             6, 0)
+        self.GLayout.addWidget(self.filterTypeBox,               6, 1)
 
-        self.GLayout.addWidget(self.integrationLabel,            6, 0)
-        self.GLayout.addWidget(self.integrationBox,              6, 1)
+        self.GLayout.addWidget(self.integrationLabel,            7, 0)
+        self.GLayout.addWidget(self.integrationBox,              7, 1)
 
-        self.GLayout.addWidget(self.reassignBtn,                 7, 1)
+        self.GLayout.addWidget(self.precisionLabel,              8, 0)
+        self.GLayout.addWidget(self.precisionBox,                8, 1)
+
+        self.GLayout.addWidget(self.followLabel,                 9, 0)
+        self.GLayout.addWidget(self.followBox,                   9, 1)
+
+        self.GLayout.addWidget(self.reassignBtn,                 10, 1)
 
         self.settings.setLayout(self.GLayout)
 
@@ -221,7 +287,7 @@ class DataFile(ListItem.ListItem):
                     button.setCursor(QtGui.QCursor(QtCore.Qt.ForbiddenCursor))
                     button.setDisabled(True)
 
-        itemList = self.data.columns.values.tolist()
+        itemList = self.preview.columns.values.tolist()
 
         xComboBox = dialog.findChild(QtWidgets.QComboBox, "xComboBox")
         yComboBox = dialog.findChild(QtWidgets.QComboBox, "yComboBox")
@@ -248,17 +314,12 @@ class DataFile(ListItem.ListItem):
         dialog.close()
 
         if ret:
-            l = self.data[xComboBox.currentText()].copy()
-            if np.all(l.to_numpy() == np.sort(l)):
-                self.config["xColumn"] = xComboBox.currentText()
-                self.config["yColumn"] = yComboBox.currentText()
-            else:
-                self.showError("Unsortierte x-Achse",
-                    """<p>Die angegebene x-Achse ist nicht chronologisch sortiert!
-                    Die korrekte Darstellung kann nicht garantiert werden.</p>""")
-        else:
-            if self.config["xColumn"] == -1 or self.config["yColumn"] == -1:
-                self.modData =  self.interpData = pd.DataFrame([0, 0.001], [0, 0])
+            previous = (self.config["xColumn"], self.config["yColumn"])
+            self.config["xColumn"] = xComboBox.currentText()
+            self.config["yColumn"] = yComboBox.currentText()
+            self.__loadData(previous)
+        elif not self.__hasData():
+            self.__setPlaceholder()
 
     def __toggleSettings(self):
         if self.settings.isHidden():
@@ -274,64 +335,247 @@ class DataFile(ListItem.ListItem):
 
         self.sigUpdateUI.emit()
 
-    def __readData(self, sep=Config.SEPERATOR, decimal=Config.DECIMAL):
+    # reads only the first few KB of the file to choose the columns from
+    # seperator and decimal point are detected for files that haven't been assigned yet
+    def __readData(self, sep=None, decimal=None):
         if not os.path.isfile(self.filename):
-            self.data = pd.DataFrame([0, 0.001], [0, 0])
+            self.preview = self.data = pd.DataFrame([0, 0.001], [0, 0])
             return
 
-        self.data = pd.read_csv(self.filename, sep=sep, decimal=decimal, header=0, skipinitialspace=True)
+        head = Ingest.readHead(self.filename)
+
+        if not sep and not decimal and (self.config["xColumn"] == -1 or self.config["yColumn"] == -1):
+            self.config["seperator"], self.config["decimal"] = Ingest.sniff(head)
+
+        sep = sep or self.config["seperator"]
+        decimal = decimal or self.config["decimal"]
+
+        self.preview = Ingest.readPreview(head, sep=sep, decimal=decimal)
+
+    # loads the selected columns on the thread pool
+    # the list item stays in place and is filled in once the data arrives
+    def __loadData(self, previous=None):
+        if not os.path.isfile(self.filename):
+            return
+
+        self.__setLoading(True)
+
+        worker = Loader.LoadWorker(self.filename, self.config)
+        signals = worker.signals
+        signals.sigProgress.connect(self.progressBar.setValue)
+        signals.sigFinished.connect(lambda result: self.__dataLoaded(signals, result, previous))
+        signals.sigError.connect(lambda message: self.__loadFailed(signals, message, previous))
+
+        self.loadSignals = signals
+        Loader.start(worker)
+
+    def __dataLoaded(self, signals, result, previous):
+        # a newer load has been started in the meantime
+        if signals is not self.loadSignals:
+            return
+
+        self.__setLoading(False)
+
+        if not result["sorted"]:
+            self.showError("Unsortierte x-Achse",
+                """<p>Die angegebene x-Achse ist nicht chronologisch sortiert!
+                Die korrekte Darstellung kann nicht garantiert werden.</p>""")
+            self.__revertColumns(previous)
+            return
+
+        self.__setResult(result)
+
+        if self.sigCalc:
+            self.sigCalc.emit()
+
+        self.updatePlot()
+        self.updateUI()
+
+    def __setResult(self, result):
+        self.data = result["data"]
+        self.modData = result["modData"]
+        self.interpData = result["interpData"]
+        self.series = result.get("series")
+        self.tailOffset = result["end"]
+        self.tailBuffers = None
+        self.embedded = None
+        self.ignore = False
+        self.version += 1
+        self.dataUpdated = True
+
+    def __loadFailed(self, signals, message, previous):
+        if signals is not self.loadSignals:
+            return
+
+        self.__setLoading(False)
+        self.showError("Datei konnte nicht geladen werden", "<p>{}</p>".format(message))
+        self.__revertColumns(previous)
+
+    def __revertColumns(self, previous):
+        if previous:
+            self.config["xColumn"], self.config["yColumn"] = previous
+
+        # nothing has been loaded successfully, the data saved with the session is the last resort
+        if self.series is None:
+            if self.embedded is not None and all(c in self.embedded for c in (self.config["xColumn"], self.config["yColumn"])):
+                self.data = self.embedded
+                self.ignore = False
+                self.recalculate()
+            else:
+                self.__setPlaceholder()
+
+        self.updatePlot()
+
+    # uses the data saved with a session
+    # while the file itself is still loading, it is only kept in case the load fails
+    def setEmbeddedData(self, data):
+        self.embedded = data
+        if not self.loading:
+            self.data = data
+            self.recalculate()
+
+    # whether the selected columns are present to be calculated
+    def __hasData(self):
+        return self.config["xColumn"] in self.data and self.config["yColumn"] in self.data
+
+    # shown until the selected columns could be loaded
+    # the item is left out of its process, so its parent doesn't combine the placeholder
+    def __setPlaceholder(self):
+        self.modData = self.interpData = ListItem.placeholder()
+        self.series = None
+        self.ignore = True
+
+    def __setLoading(self, loading):
+        self.loading = loading
+        self.ignore = loading
+        self.settings.setEnabled(not loading)
+        self.progressBar.setValue(0)
+        self.progressBar.setVisible(loading)
 
     # applies all calculations and interpolation
     def recalculate(self):
         dlg = pg.ProgressDialog("Berechnung", cancelText=None, busyCursor=False, disable=False, wait=250)
         dlg.setValue(0)
 
-        if self.config["xColumn"] == -1 or self.config["yColumn"] == -1:
+        if self.loading or not self.__hasData():
             return
 
         dlg += 10
 
-        self.calculateCommon(dlg)
+        # the data has been replaced, e.g. by opening a save file
+        if self.series is None or self.series.data is not self.data:
+            self.series = Pipeline.ColumnSeries(self.data)
 
-        x = self.modData["x"].values
-        y = self.modData["y"].values
+        # only the stages affected by the changed settings are calculated again
+        self.calculateSeries()
 
-        dlg += 10
+        self.tailBuffers = None
 
-        # interpolate data
-        if self.config["interpolation"] != "keine" and self.config["interpolation"] != "linear":
-
-            # generate common x samples
-            xnew = np.linspace(
-                x.min(), # from
-                x.max(), # to
-                int(min([max([
-                    np.ceil(((x.max() - x.min()) / Config.DIVISION) * Config.PPD),
-                    Config.PPD,
-                    len(x)
-                ]), Config.MAX]))
-            )
-
-            dlg += 10
-            spl = interp1d(x, y, kind=self.config["interpolation"], copy=False,
-                    assume_sorted=True, bounds_error=False, fill_value=0)
-            dlg += 10
-            y = spl(xnew)
-            x = xnew
-            dlg += 10
+        dlg.setValue(100)
 
-        dlg += 10
+        if self.sigCalc:
+            self.sigCalc.emit()
 
-        self.dataUpdated = True
+    # the stored columns change their type, so they are loaded again
+    def __setPrecision(self, precision):
+        self.config["precision"] = precision
 
-        # save data
-        self.interpData = {'x': x, 'y': y}
+        if self.config["xColumn"] != -1 and self.config["yColumn"] != -1:
+            self.__loadData()
 
-        dlg.setValue(100)
+    def __setFollow(self, follow):
+        self.config["follow"] = bool(follow) and not Ingest.isCompressed(self.filename)
+
+        if self.config["follow"]:
+            self.tailTimer.start(int(1000 / Config.TAIL_RATE))
+        else:
+            self.tailTimer.stop()
+
+    # picks up rows appended to the file since the last update
+    # called at most Config.TAIL_RATE times per second
+    def __tail(self):
+        if self.loading or not self.__hasData():
+            return
+
+        # appended rows are picked up once a running drag has finished
+        if self.pendingOffset:
+            return
+
+        try:
+            size = os.path.getsize(self.filename)
+        except OSError:
+            return
+
+        if size == self.tailOffset:
+            return
+
+        # file has been truncated or replaced
+        if size < self.tailOffset:
+            self.__loadData()
+            return
+
+        header = self.preview.columns.values.tolist()
+        (x, y), self.tailOffset = Ingest.readTail(self.filename, self.tailOffset,
+                [header.index(self.config["xColumn"]), header.index(self.config["yColumn"])],
+                sep=self.config["seperator"], decimal=self.config["decimal"])
+
+        if len(x) == 0:
+            return
+
+        count = len(self.data[self.config["xColumn"]])
+        self.data.append({self.config["xColumn"]: x, self.config["yColumn"]: y})
+
+        self.__extendResults(count)
+
+        # the tail is calculated separately, the cached stages are outdated now
+        if self.series is not None:
+            self.series.invalidate()
+        self.version += 1
 
         if self.sigCalc:
             self.sigCalc.emit()
 
+        self.updatePlot()
+
+    # recalculates only the samples affected by the appended rows
+    # results are kept in growable buffers, so they are extended in place
+    def __extendResults(self, count):
+        previous = (self.interpData["x"], self.interpData["y"])
+        if self.tailBuffers is None:
+            self.tailBuffers = {}
+            for key, values in (
+                    ("modX", self.modData["x"]), ("modY", self.modData["y"]),
+                    ("interpX", self.interpData["x"]), ("interpY", self.interpData["y"])):
+                values = np.asarray(values)
+                buffer = Ingest.ColumnBuffer(len(values) * 1.5, values.dtype)
+                buffer.extend(values)
+                self.tailBuffers[key] = buffer
+            self.tailState = None
+
+        start, x, y, self.tailState = Pipeline.calculateTail(
+            self.data[self.config["xColumn"]], self.data[self.config["yColumn"]], self.config, count, self.tailState)
+        self.__extendBuffers("modX", "modY", start, x, y)
+        self.modData = {'x': self.tailBuffers["modX"].view(), 'y': self.tailBuffers["modY"].view()}
+
+        if self.config["interpolation"] == "keine" or self.config["interpolation"] == "linear":
+            self.interpData = self.modData
+        else:
+            start, x, y = Pipeline.interpolateTail(
+                self.modData["x"], self.modData["y"], self.tailBuffers["interpX"].view(), start, self.config)
+            self.__extendBuffers("interpX", "interpY", start, x, y)
+            self.interpData = {'x': self.tailBuffers["interpX"].view(), 'y': self.tailBuffers["interpY"].view()}
+
+        # the buffers hold the offsets already
+        # if the plot has drawn the previous buffers, it only extends its envelopes from the first changed sample
+        self.drawData = (self.interpData, self.interpData["x"], self.interpData["y"], (0.0, 0.0), previous + (start,))
+
+        self.dataUpdated = True
+
+    def __extendBuffers(self, xKey, yKey, start, x, y):
+        for key, values in ((xKey, x), (yKey, y)):
+            self.tailBuffers[key].truncate(start)
+            self.tailBuffers[key].extend(values)
+
     # reflects updated values in the UI
     def updateUI(self):
         self.x_offset.setValue(self.config["xOffset"])
@@ -351,7 +595,7 @@ class DataFile(ListItem.ListItem):
 
     def setZIndex(self, zIndex):
         self.config["zIndex"] = zIndex
-        self.updatePlot()
+        self.updateStyle()
         return zIndex - 1
 
     def toDict(self):
@@ -0,0 +1,112 @@
+# Decimation.py
+# by Robin Prillwitz
+# 18.10.2026
+#
+
+import numpy as np
+
+# Reduces the visible part of a series to what can actually be seen.
+# The budget is the width of the view in pixels, every mode returns a few points per pixel column.
+# "minmax" reads the envelope from the pyramid of the series and doesn't depend on its length,
+# the other modes look at every visible sample once.
+
+# minimum and maximum of every pixel column
+def minmax(pyramid, start, stop, budget):
+    return pyramid.query(start, stop, budget)
+
+# first, minimum, maximum and last sample of every pixel column
+# draws exactly the same lines as the full data
+def m4(pyramid, start, stop, budget):
+    x = pyramid.x[start:stop]
+    y = pyramid.y[start:stop]
+    if len(y) <= 4 * budget:
+        return x, y
+
+    size = -(-len(y) // budget)
+    end = (len(y) // size) * size
+
+    rows = y[:end].reshape(-1, size)
+    first = np.arange(rows.shape[0]) * size
+    index = np.stack([first, first + rows.argmin(axis=1), first + rows.argmax(axis=1), first + size - 1], axis=1)
+
+    if end < len(y):
+        rest = y[end:]
+        index = np.vstack([index, [end, end + rest.argmin(), end + rest.argmax(), len(y) - 1]])
+
+    # keep the samples of every column in their original order
+    index.sort(axis=1)
+    index = index.ravel()
+
+    return x[index], y[index]
+
+# Largest-Triangle-Three-Buckets with two samples per pixel column
+# every bucket keeps the sample spanning the largest triangle with the averages of its neighbouring buckets,
+# using the averages on both sides instead of the previously chosen sample allows to do all buckets at once
+def lttb(pyramid, start, stop, budget):
+    x = pyramid.x[start:stop]
+    y = pyramid.y[start:stop]
+    points = 2 * budget
+    if len(y) <= points or points < 3:
+        return x, y
+
+    # buckets between the first and the last sample, which are always kept
+    edges = np.linspace(1, len(y) - 1, points - 1).astype(np.int64)
+    counts = np.diff(edges)
+    edges = edges[:-1][counts > 0]
+    counts = counts[counts > 0]
+
+    innerX = np.asarray(x[1:-1], dtype=np.float64)
+    innerY = np.asarray(y[1:-1], dtype=np.float64)
+    offsets = edges - 1
+
+    meanX = np.add.reduceat(innerX, offsets) / counts
+    meanY = np.add.reduceat(innerY, offsets) / counts
+
+    # neighbours of every bucket, the outer buckets use the first and last sample
+    ax = np.concatenate([[x[0]], meanX[:-1]])
+    ay = np.concatenate([[y[0]], meanY[:-1]])
+    cx = np.concatenate([meanX[1:], [x[-1]]])
+    cy = np.concatenate([meanY[1:], [y[-1]]])
+
+    bucket = np.repeat(np.arange(len(counts)), counts)
+    area = np.abs((ax[bucket] - cx[bucket]) * (innerY - ay[bucket])
+            - (ax[bucket] - innerX) * (cy[bucket] - ay[bucket]))
+
+    # first sample with the largest area in every bucket
+    largest = np.flatnonzero(area == np.repeat(np.maximum.reduceat(area, offsets), counts))
+    buckets, first = np.unique(bucket[largest], return_index=True)
+    index = np.concatenate([[0], largest[first] + 1, [len(y) - 1]])
+
+    return x[index], y[index]
+
+# every n-th sample, for smooth data that has no detail between the samples anyway
+def stride(pyramid, start, stop, budget):
+    step = max(-(-(stop - start) // (2 * budget)), 1)
+    index = np.arange(start, stop, step)
+    if index[-1] != stop - 1:
+        index = np.append(index, stop - 1)
+    return pyramid.x[index], pyramid.y[index]
+
+DECIMATORS = {
+    "minmax": minmax,
+    "m4": m4,
+    "lttb": lttb,
+    "stride": stride
+}
+
+# cheapest mode that looks right for an item, unless its config names one
+# single points are drawn as actual samples, lines as their envelope
+# splines are smooth on the scale of their grid, a stride is enough for them
+def choose(config):
+    mode = config.get("decimation", "auto")
+    if mode != "auto":
+        return mode
+
+    if config["interpolation"] == "keine":
+        return "lttb"
+    if config["interpolation"] != "linear":
+        return "stride"
+    return "minmax"
+
+def decimate(mode, pyramid, start, stop, budget):
+    return DECIMATORS.get(mode, minmax)(pyramid, start, stop, max(int(budget), 1))
@@ -0,0 +1,113 @@
+# Filter.py
+# by Robin Prillwitz
+# 18.10.2026
+#
+
+import numpy as np
+from scipy import signal
+from scipy.ndimage.filters import gaussian_filter1d
+
+import Config
+
+# Smoothing kernels for data series.
+# The strength is always given as the sigma of a comparable gaussian in samples,
+# so switching the kernel keeps the amount of smoothing roughly the same.
+# All kernels except "Gauß" take the same time for any sigma.
+
+# odd window width whose box has a standard deviation of about sigma
+def width(sigma):
+    return 2 * int(round(np.sqrt(3) * sigma)) + 1
+
+# Savitzky-Golay needs a window wider than its polynomial order
+def savgolWidth(sigma):
+    return max(width(sigma), 2 * (Config.SAVGOL_ORDER // 2) + 3)
+
+# gaussian, exact but slower with larger sigma
+def gauss(y, sigma):
+    return gaussian_filter1d(y, sigma=sigma)
+
+# moving average over a window of the same standard deviation, using prefix sums
+def movingAverage(y, sigma):
+    w = width(sigma)
+    if w < 2 or len(y) == 0:
+        return y.copy()
+
+    half = w // 2
+    padded = np.pad(y.astype(np.float64), (half + 1, half), mode="edge")
+    sums = np.cumsum(padded)
+
+    return (sums[w:] - sums[:-w]) / w
+
+# recursive gaussian after Young and van Vliet
+# a third order IIR filter run forwards and backwards
+def recursiveGauss(y, sigma):
+    if sigma < 0.5 or len(y) < 4:
+        return gauss(y, sigma)
+
+    if sigma >= 2.5:
+        q = 0.98711 * sigma - 0.96330
+    else:
+        q = 3.97156 - 4.14554 * np.sqrt(1 - 0.26891 * sigma)
+
+    b0 = 1.57825 + 2.44413 * q + 1.4281 * q**2 + 0.422205 * q**3
+    b1 = 2.44413 * q + 2.85619 * q**2 + 1.26661 * q**3
+    b2 = -(1.4281 * q**2 + 1.26661 * q**3)
+    b3 = 0.422205 * q**3
+    b = [1 - (b1 + b2 + b3) / b0]
+    a = [1, -b1 / b0, -b2 / b0, -b3 / b0]
+
+    # start in the steady state of the first and last sample, so the ends don't get pulled to 0
+    zi = signal.lfilter_zi(b, a)
+    y = np.asarray(y, dtype=np.float64)
+    forward, _ = signal.lfilter(b, a, y, zi=zi * y[0])
+    backward, _ = signal.lfilter(b, a, forward[::-1], zi=zi * forward[-1])
+
+    return backward[::-1]
+
+# Savitzky-Golay with a window of the same width as the moving average
+# the coefficients are convolved via FFT, so the window width barely matters
+# on short series the window shrinks to the longest odd width that still fits
+def savitzkyGolay(y, sigma):
+    w = min(savgolWidth(sigma), len(y) - 1 + len(y) % 2)
+    if w < Config.SAVGOL_ORDER + 2:
+        return gauss(y, sigma)
+
+    half = w // 2
+    padded = np.pad(y.astype(np.float64), half, mode="reflect")
+
+    return signal.fftconvolve(padded, signal.savgol_coeffs(w, Config.SAVGOL_ORDER), mode="valid")
+
+# zero phase Butterworth lowpass
+# the cutoff is the -3 dB frequency of a gaussian with the same sigma
+# series too short for the padding of sosfiltfilt use the recursive gaussian instead
+def butterworth(y, sigma):
+    cutoff = min(0.265 / sigma, 0.99)
+    sos = signal.butter(Config.BUTTER_ORDER, cutoff, output="sos")
+
+    if len(y) <= 3 * (2 * len(sos) + 1):
+        return recursiveGauss(y, sigma)
+
+    return signal.sosfiltfilt(sos, y)
+
+FILTERS = {
+    "Gauß": gauss,
+    "Gleitender Mittelwert": movingAverage,
+    "Rekursiver Gauß": recursiveGauss,
+    "Savitzky-Golay": savitzkyGolay,
+    "Butterworth": butterworth
+}
+
+def apply(y, sigma, kind="Gauß"):
+    return FILTERS.get(kind, gauss)(y, sigma).astype(y.dtype, copy=False)
+
+# samples at the end of a series that change when samples are appended
+# None if the filter reaches back through the whole series
+def reach(sigma, kind="Gauß"):
+    if kind == "Gauß":
+        # gaussian_filter1d truncates its kernel at 4 sigma
+        return int(4.0 * sigma + 0.5)
+    if kind == "Gleitender Mittelwert":
+        return width(sigma) // 2
+    if kind == "Savitzky-Golay":
+        return savgolWidth(sigma) // 2
+    return None
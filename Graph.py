@@ -7,21 +7,83 @@ from PyQt5 import QtGui, QtCore, QtWidgets
 import pyqtgraph as pg
 import numpy as np
 import Config
+import Decimation
+import Pyramid
 
 
 class Graph(pg.PlotDataItem):
     sigPositionDelta = QtCore.pyqtSignal(float, float)
+    sigDragFinished = QtCore.pyqtSignal()
 
     def __init__(self, *args, **kwds):
         pg.PlotDataItem.__init__(self, **kwds)
         self.setData(*args)
         self.allowDrag = False
-        self.limit = 500
+
+        # shape of the symbols while they are shown
+        self.symbol = self.opts["symbol"]
+
+        # shift of the displayed data that hasn't been applied to the data itself yet
+        self.viewOffset = (0.0, 0.0)
+        # offsets of the data, drawn by moving the plot so the envelopes stay the same
+        self.dataOffset = (0.0, 0.0)
+
+        # envelopes of the displayed data, built again whenever the data changes
+        self.source = (None, None)
+        self.pyramid = None
+
+        # what has been drawn last, to skip drawing the same again
+        self.drawn = None
+
+        # mouse movements are collected and emitted at most once per frame
+        self.pendingDelta = None
+        self.frameTimer = QtCore.QTimer()
+        self.frameTimer.setSingleShot(True)
+        self.frameTimer.setInterval(int(1000 / Config.FRAME_RATE))
+        self.frameTimer.timeout.connect(self.__emitDelta)
 
         self.curve.setClickable(True)
         self.curve.mouseDragEvent = self.mouseDragEvent
         self.scatter.mouseDragEvent = self.mouseDragEvent
 
+    # sets pens and brushes on the curve and the symbols directly, without passing the data again
+    # pens are shared between items, so unchanged ones are recognised by identity
+    # symbols are only kept while they have a pen or brush, so lines don't maintain invisible spots
+    def setStyle(self, **style):
+        changed = {k: v for k, v in style.items() if self.opts.get(k) is not v}
+        if not changed:
+            return
+        self.opts.update(changed)
+
+        x, y = self.getData()
+        hasData = x is not None and y is not None and len(x) > 0
+
+        if "pen" in changed or "shadowPen" in changed:
+            if self.opts["pen"] is None:
+                self.curve.hide()
+            elif self.curve.isVisible() or not hasData:
+                self.curve.setPen(self.opts["pen"])
+                self.curve.setShadowPen(self.opts["shadowPen"])
+                self.curve.show()
+            else:
+                # data set while the curve was hidden hasn't reached it
+                self.curve.setData(x=x, y=y, pen=self.opts["pen"], shadowPen=self.opts["shadowPen"])
+                self.curve.show()
+
+        if "symbolPen" in changed or "symbolBrush" in changed:
+            if self.opts["symbolPen"] is None and self.opts["symbolBrush"] is None:
+                self.opts["symbol"] = None
+                self.scatter.hide()
+            elif self.opts["symbol"] is None:
+                self.opts["symbol"] = self.symbol
+                if hasData:
+                    self.scatter.setData(x=x, y=y, symbol=self.symbol, size=self.opts["symbolSize"],
+                            pen=self.opts["symbolPen"], brush=self.opts["symbolBrush"])
+                self.scatter.show()
+            else:
+                self.scatter.setPen(self.opts["symbolPen"])
+                self.scatter.setBrush(self.opts["symbolBrush"])
+
     def setDraggable(self, isDraggable):
         self.allowDrag = isDraggable
 
@@ -40,15 +102,45 @@ class Graph(pg.PlotDataItem):
                 else:
                     delta[0] = 0
 
-            self.sigPositionDelta.emit(delta[0], delta[1])
+            pending = self.pendingDelta or (0.0, 0.0)
+            self.pendingDelta = (pending[0] + delta[0], pending[1] + delta[1])
+
+            if ev.isFinish():
+                self.frameTimer.stop()
+                self.__emitDelta()
+                self.sigDragFinished.emit()
+            elif not self.frameTimer.isActive():
+                self.frameTimer.start()
             ev.accept()
         else:
             ev.ignore()
 
+    def __emitDelta(self):
+        if self.pendingDelta is not None:
+            delta = self.pendingDelta
+            self.pendingDelta = None
+            self.sigPositionDelta.emit(*delta)
+
+    # moves the displayed data without touching it
+    def setViewOffset(self, dx, dy):
+        self.viewOffset = (dx, dy)
+        self.setPos(*self.__offset())
+
+    # where the data is drawn relative to its own coordinates
+    def __offset(self):
+        return (self.dataOffset[0] + self.viewOffset[0], self.dataOffset[1] + self.viewOffset[1])
+
     # modified from the pyqtgraph example at
     # https://github.com/pyqtgraph/pyqtgraph/blob/develop/examples/hdf5.py
-    def setDownsampleData(self, x, y):
+    # only the samples inside the visible x range are drawn, at their real x positions
+    # larger ranges are decimated to a few points per pixel, see Decimation for the modes
+    # offset is added to the data by moving the plot, so changing it keeps the envelopes
+    # appended is (previous x, previous y, first changed sample) for data that continues the previous one,
+    # if the previous data is what has been drawn, only the envelopes from the first changed sample on are built again
+    def setDownsampleData(self, x, y, mode="minmax", offset=(0.0, 0.0), appended=None):
         if x is None or y is None:
+            self.source = (None, None)
+            self.drawn = None
             self.setData([])
             return
 
@@ -56,51 +148,43 @@ class Graph(pg.PlotDataItem):
         if vb is None:
             return  # no ViewBox yet
 
+        changed = x is not self.source[0] or y is not self.source[1]
+        if changed:
+            if (appended is not None and self.pyramid is not None
+                    and appended[0] is self.source[0] and appended[1] is self.source[1]):
+                self.pyramid.extend(x, y, appended[2])
+            else:
+                self.pyramid = Pyramid.Pyramid(x, y)
+            self.source = (x, y)
+            self.drawn = None
+        self.dataOffset = tuple(offset)
+        dx, dy = self.__offset()
+
+        pyramid = self.pyramid
+        if len(pyramid) == 0:
+            self.setData([])
+            return
+
         # Determine what data range must be read
+        # one sample more on each side, so lines leave the view instead of ending in it
         xrange = vb.viewRange()[0]
-        limits = [
-            max(0,int(xrange[0])-1),
-            min(len(x), int(xrange[1]+2)) ]
-        start = np.min(limits)
-        stop = np.max(limits)
-
-        # Decide by how much we should downsample
-        ds = int((stop-start) / self.limit) + 1
-
-        if ds == 1:
-            # Small enough to display with no intervention.
-            visible = y
-            scale = 1
-            start = 0
-        else:
-            # Here convert data into a down-sampled array suitable for visualizing.
-            # Must do this piecewise to limit memory usage.
-            samples = 1 + ((stop-start) // ds)
-            visible = np.zeros(samples*2, dtype=y.dtype)
-            sourcePtr = start
-            targetPtr = 0
-
-            chunkSize = (100000//ds) * ds
-            while sourcePtr < stop-1:
-                chunk = y[sourcePtr:min(stop,sourcePtr+chunkSize)]
-                sourcePtr += len(chunk)
-
-                # reshape chunk to be integral multiple of ds
-                chunk = chunk[:(len(chunk)//ds) * ds].reshape(len(chunk)//ds, ds)
-
-                # compute max and min
-                chunkMax = chunk.max(axis=1)
-                chunkMin = chunk.min(axis=1)
-
-                # interleave min and max into plot data to preserve envelope shape
-                visible[targetPtr:targetPtr+chunk.shape[0]*2:2] = chunkMin
-                visible[1+targetPtr:1+targetPtr+chunk.shape[0]*2:2] = chunkMax
-                targetPtr += chunk.shape[0]*2
-
-            visible = visible[:targetPtr]
-            scale = ds * 0.5
-
-        self.setData(x[0:len(visible)], visible) # update the plot
-        self.setPos(start, 0) # shift to match starting index
-        self.resetTransform()
-        self.scale(scale, 1)  # scale to match downsampling
+
+        # a series out of view stays as it is, whatever was drawn of it is out of view as well
+        if not changed and self.drawn is not None and (
+                pyramid.x[-1] + dx < xrange[0] or pyramid.x[0] + dx > xrange[1]):
+            self.setPos(dx, dy)
+            return
+
+        start = max(0, int(np.searchsorted(pyramid.x, xrange[0] - dx, side="left")) - 1)
+        stop = min(len(pyramid), int(np.searchsorted(pyramid.x, xrange[1] - dx, side="right")) + 1)
+        if stop - start < 2:
+            start = max(0, min(start, len(pyramid) - 2))
+            stop = min(len(pyramid), start + 2)
+
+        budget = max(int(vb.width()), 100)
+
+        drawn = (start, stop, budget, mode)
+        if drawn != self.drawn:
+            self.drawn = drawn
+            self.setData(*Decimation.decimate(mode, pyramid, start, stop, budget)) # update the plot
+        self.setPos(dx, dy)
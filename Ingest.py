@@ -0,0 +1,206 @@
+# Ingest.py
+# by Robin Prillwitz
+# 18.10.2026
+#
+
+import io
+import re
+import os
+import csv
+import bz2
+import gzip
+import lzma
+
+import pandas as pd
+import numpy as np
+
+import Config
+
+# compressed formats, decompressed while reading
+COMPRESSION = {
+    ".gz": lambda fh: gzip.GzipFile(fileobj=fh, mode="rb"),
+    ".xz": lambda fh: lzma.LZMAFile(fh, mode="rb"),
+    ".bz2": lambda fh: bz2.BZ2File(fh, mode="rb"),
+}
+
+# growable, contiguous float array
+# used to collect a column chunk by chunk without keeping the chunks around
+class ColumnBuffer:
+    def __init__(self, capacity=0, dtype=np.float64):
+        self.array = np.empty(max(int(capacity), 1), dtype=dtype)
+        self.size = 0
+
+    def extend(self, values):
+        end = self.size + len(values)
+        if end > len(self.array):
+            # grow by 50% to keep the amount of copies logarithmic
+            # the old array is left intact, views onto it stay valid
+            array = np.empty(max(end, int(len(self.array) * 1.5)), dtype=self.array.dtype)
+            array[:self.size] = self.array[:self.size]
+            self.array = array
+
+        self.array[self.size:end] = values
+        self.size = end
+
+    # drops everything after the given length
+    def truncate(self, size):
+        self.size = min(self.size, size)
+
+    def view(self):
+        return self.array[:self.size]
+
+    def finish(self):
+        # shrink in place, so no second copy of the column is needed
+        # there must not be any views onto the buffer at this point
+        self.array.resize(self.size, refcheck=False)
+        return self.array
+
+
+# file object that ends after a given amount of bytes
+class LimitedReader(io.RawIOBase):
+    def __init__(self, fh, limit):
+        self.fh = fh
+        self.remaining = limit
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.fh.read(min(len(buffer), self.remaining))
+        buffer[:len(data)] = data
+        self.remaining -= len(data)
+        return len(data)
+
+
+def isCompressed(filename):
+    return os.path.splitext(filename)[1].lower() in COMPRESSION
+
+# opens a file for reading, compressed files are decompressed on the fly
+# returns the decompressed stream and the raw file, whose position tells the progress
+def openSource(filename):
+    raw = open(filename, "rb")
+    opener = COMPRESSION.get(os.path.splitext(filename)[1].lower())
+    if opener is None:
+        return raw, raw
+
+    return opener(raw), raw
+
+def closeSource(stream, raw):
+    stream.close()
+    raw.close()
+
+# reads the first few KB of a file, but at least the header and one full row
+def readHead(filename):
+    stream, raw = openSource(filename)
+    try:
+        head = stream.read(Config.SNIFF_BYTES)
+        while head.count(b"\n") < 2:
+            more = stream.read(Config.SNIFF_BYTES)
+            if not more:
+                break
+            head += more
+    finally:
+        closeSource(stream, raw)
+
+    # drop the last, possibly incomplete line
+    if head.count(b"\n") >= 2:
+        head = head[:head.rindex(b"\n") + 1]
+
+    return head.decode("utf-8-sig", errors="replace")
+
+# guesses seperator and decimal point from the beginning of a file
+# falls back to the defaults in Config if the file is inconclusive
+def sniff(head):
+    sep = Config.SEPERATOR
+    try:
+        sep = csv.Sniffer().sniff(head, delimiters=";,\t|").delimiter
+    except csv.Error:
+        pass
+
+    # numbers with a comma can only appear if the comma isn't the seperator
+    # if the beginning only holds integers, the default is kept as long as it differs from the seperator
+    decimal = Config.DECIMAL if Config.DECIMAL != sep else "."
+    rows = head.splitlines()[1:]
+    if sep != "," and any(re.search(r"(^|[^\d,])[-+]?\d+,\d+([eE][-+]?\d+)?\s*($|" + re.escape(sep) + ")", row) for row in rows):
+        decimal = ","
+    elif sep != "." and any(re.search(r"(^|[^\d.])[-+]?\d*\.\d+([eE][-+]?\d+)?\s*($|" + re.escape(sep) + ")", row) for row in rows):
+        decimal = "."
+
+    return sep, decimal
+
+# position right after the last complete line of a file
+def completeLength(filename):
+    with open(filename, "rb") as fh:
+        fh.seek(0, os.SEEK_END)
+        position = fh.tell()
+
+        while position > 0:
+            step = min(Config.SNIFF_BYTES, position)
+            position -= step
+            fh.seek(position)
+            index = fh.read(step).rfind(b"\n")
+            if index >= 0:
+                return position + index + 1
+
+    return 0
+
+# parses the header and a few rows, enough to choose the columns from
+def readPreview(head, sep=Config.SEPERATOR, decimal=Config.DECIMAL):
+    return pd.read_csv(io.StringIO(head), sep=sep, decimal=decimal, header=0,
+            skipinitialspace=True, nrows=Config.PREVIEW_ROWS)
+
+# streams the given columns of a file in chunks of Config.CHUNKSIZE rows
+# compressed files are decompressed on the fly, without a temporary file
+# only the requested columns are converted, with a fixed float type instead of type inference
+# progress gets called with the fraction of bytes read so far
+# limit stops reading after the given amount of (decompressed) bytes
+# dtypes maps columns to their storage type, float64 by default
+def readColumns(filename, columns, sep=Config.SEPERATOR, decimal=Config.DECIMAL, progress=None, limit=None, dtypes=None):
+    columns = list(dict.fromkeys(columns))
+    dtypes = {c: (dtypes or {}).get(c, np.float64) for c in columns}
+    size = max(os.path.getsize(filename) if limit is None else limit, 1)
+
+    buffers = None
+
+    stream, raw = openSource(filename)
+    try:
+        source = stream if limit is None else io.BufferedReader(LimitedReader(stream, limit))
+        reader = pd.read_csv(source, sep=sep, decimal=decimal, header=0, skipinitialspace=True,
+                usecols=columns, dtype=dtypes, chunksize=Config.CHUNKSIZE)
+
+        for chunk in reader:
+            if buffers is None:
+                # estimate the final row count from the size of the first chunk
+                rows = int(len(chunk) * size / max(raw.tell(), 1) * 1.05) + 1
+                buffers = {c: ColumnBuffer(rows, dtypes[c]) for c in columns}
+
+            for c in columns:
+                buffers[c].extend(chunk[c].to_numpy())
+
+            if progress:
+                progress(min(raw.tell() / size, 1.0))
+    finally:
+        closeSource(stream, raw)
+
+    if buffers is None:
+        return {c: np.empty(0, dtype=dtypes[c]) for c in columns}
+
+    return {c: buffers[c].finish() for c in columns}
+
+# parses the complete lines appended to a file since the given byte offset
+# columns are given by position, as there is no header in the appended part
+# returns the new columns and the offset to continue from
+def readTail(filename, offset, columns, sep=Config.SEPERATOR, decimal=Config.DECIMAL):
+    with open(filename, "rb") as fh:
+        fh.seek(offset)
+        appended = fh.read()
+
+    end = appended.rfind(b"\n") + 1
+    if end <= 0:
+        return [np.empty(0, dtype=np.float64) for c in columns], offset
+
+    positions = list(dict.fromkeys(columns))
+    chunk = pd.read_csv(io.BytesIO(appended[:end]), sep=sep, decimal=decimal, header=None,
+            skipinitialspace=True, usecols=positions, dtype={c: np.float64 for c in positions})
+
+    return [chunk[c].to_numpy() for c in columns], offset + end
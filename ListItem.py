@@ -3,61 +3,117 @@
 # 16.3.2020
 #
 
+import functools
+import itertools
 from PyQt5 import QtGui, QtCore, QtWidgets
-from scipy import integrate
 from scipy.signal import decimate
 from scipy.interpolate import make_interp_spline
-from scipy.ndimage.filters import gaussian_filter1d
 import pyqtgraph as pg
 import numpy as np
-import pandas as pd
 import Config
+import Decimation
 import Graph
 import Exporter
 
+# settings of a freshly created item
+def defaultConfig(color):
+    return {
+        "highlight": False,
+        "enabled": True,
+        "cursorEnabled": True,
+        "zIndex": 0,
+        "xOffset": 0,
+        "yOffset": 0,
+        "xColumn": -1,
+        "yColumn": -1,
+        "seperator": Config.SEPERATOR,
+        "decimal": Config.DECIMAL,
+        "color": color,
+        "width": 3,
+        "interpolation": "linear",
+        "interpolationAmount":  100,
+        "integrate": 0,
+        "filter": 0,
+        "filterType": "Gauß",
+        "decimation": "auto",
+        "precision": Config.DTYPE
+    }
+
+# pens and colors for a color and width, shared by all items that look the same
+@functools.lru_cache(maxsize=256)
+def styles(color, width):
+    h, s, v = color
+
+    base = QtGui.QColor()
+    base.setHsvF(h / 360, s / 100, v / 100)
+
+    highlight = QtGui.QColor()
+    highlight.setHsvF(h / 360, s / 100, v / 100, 0.2)
+
+    return {
+        "color": base,
+        "pen": pg.mkPen(color=base, width=width),
+        "highlightColor": highlight,
+        "highlightPen": pg.mkPen(color=highlight, width=width * 4 + 10),
+        "cursorPen": pg.mkPen(color=base, width=max(1, width / 2)),
+        "hiddenPen": pg.mkPen(color=(0, 0, 0, 0), width=0)
+    }
+
+# drawn instead of the data of disabled items
+HIDDEN_DATA = (np.array([0, 0.001]), np.array([0.0, 0.0]))
+
+# data of items that have nothing to show yet, in the same form as calculated data
+def placeholder(y=0.0, width=0.001):
+    return {'x': np.array([0, width]), 'y': np.array([y, y], dtype=np.float64)}
+
 class ListItem(QtWidgets.QWidget):
     sigUpdateUI = QtCore.pyqtSignal()
     sigCalc = QtCore.pyqtSignal()
 
     sigDeleteMe = QtCore.pyqtSignal(["QObject"])
 
+    # hands out identities that are never reused, unlike id() of an item that has been deleted
+    counter = itertools.count()
+
     def __init__(self, color, config=None, parent=None):
         super().__init__()
 
         self.parent = parent
+        self.container = None   # list the item is shown in
 
         if config:
             self.config = config
         else:
-            self.config = {
-                "highlight": False,
-                "enabled": True,
-                "cursorEnabled": True,
-                "zIndex": 0,
-                "xOffset": 0,
-                "yOffset": 0,
-                "xColumn": -1,
-                "yColumn": -1,
-                "seperator": Config.SEPERATOR,
-                "decimal": Config.DECIMAL,
-                "color": color,
-                "width": 3,
-                "interpolation": "linear",
-                "interpolationAmount":  100,
-                "integrate": 0,
-                "filter": 0
-            }
+            self.config = defaultConfig(color)
+
+        # not present in older save files
+        self.config.setdefault("precision", Config.DTYPE)
+        self.config.setdefault("filterType", "Gauß")
+        self.config.setdefault("decimation", "auto")
 
         self.cursor = None
         self.plot = None
         self.modData = None
         self.interpData = None
+        # (interpData, x, y, offsets, first changed sample) of what the plot draws for interpData
+        self.drawData = None
         self.ignore = False
         self.dataUpdated = False
 
+        # cached calculations and a counter that changes with the results
+        # parents only combine their children again if the counter has changed
+        self.series = None
+        self.version = 0
+        self.uid = next(ListItem.counter)
+
+        # offsets added while dragging, only shown by moving the plot
+        self.pendingOffset = None
+
         self.plot = Graph.Graph(symbol='o', symbolSize=5)
         self.plot.sigPositionDelta.connect(self.__applyDelta)
+        self.plot.sigDragFinished.connect(self.__finishDelta)
         self.cursor = pg.InfiniteLine(angle=0, movable=False)
+        self.cursorPen = None
 
         self.item = QtWidgets.QListWidgetItem()
         self.frame = QtWidgets.QWidget()
@@ -71,10 +127,37 @@ class ListItem(QtWidgets.QWidget):
 
 # ---------------------------------- private --------------------------------- #
 
+    # while dragging the offsets are only applied to the displayed plot
+    # the data is calculated once the drag has finished
     def __applyDelta(self, dx, dy):
         self.config["xOffset"] += dx
         self.config["yOffset"] += dy
 
+        pending = self.pendingOffset or (0.0, 0.0)
+        self.pendingOffset = (pending[0] + dx, pending[1] + dy)
+        self.plot.setViewOffset(*self.pendingOffset)
+
+        self.updateUI()
+
+    # scrubbing an offset spinner is shown like a drag
+    def __scrubOffset(self, spinner, value, who):
+        if not spinner.scrubbing:
+            self.applyChange(value, who)
+            return
+
+        delta = value - self.config[who]
+        if who == "xOffset":
+            self.__applyDelta(delta, 0.0)
+        else:
+            self.__applyDelta(0.0, delta)
+
+    def __finishDelta(self):
+        if self.pendingOffset is None:
+            return
+
+        self.pendingOffset = None
+        self.plot.setViewOffset(0.0, 0.0)
+
         self.recalculate()
         self.updateUI()
         self.updatePlot()
@@ -118,41 +201,32 @@ class ListItem(QtWidgets.QWidget):
 
         error_dialog.exec_()
 
-    def calculateCommon(self, dlg=None):
-        x = self.data[self.config["xColumn"]].copy()
-        y = self.data[self.config["yColumn"]].copy()
-
-        if dlg:
-            dlg += 10
+    # pulls the results from the cached pipeline of the item
+    # only the stages affected by a config change are calculated again
+    def calculateSeries(self):
+        version = self.series.version()
 
-        # apply gaussian filter
-        if self.config["filter"] > 0:
-            y = gaussian_filter1d(y, sigma=self.config["filter"])
+        # offsets of a running drag are still shown by moving the plot
+        config = self.config
+        if self.pendingOffset:
+            config = dict(self.config)
+            config["xOffset"] -= self.pendingOffset[0]
+            config["yOffset"] -= self.pendingOffset[1]
 
-        if dlg:
-            dlg += 5
+        self.modData = self.series.modData(config)
+        self.interpData = self.series.interpData(config)
 
-        # calculate numeric integration / differential
-        if self.config["integrate"] > 0:
-            for i in range(self.config["integrate"]):
-                for j, val in enumerate(x):
-                    y[j] = integrate.quad(lambda _: y[j], 0, val)[0]
-                if dlg:
-                    dlg += 1
-        elif self.config["integrate"] < 0:
-            for i in range(abs(self.config["integrate"])):
-                y = np.gradient(y, x[1] - x[0])
-                if dlg:
-                    dlg += 1
+        # the plot draws the data without offsets and is moved by them instead
+        x, y = self.series.interpBase(config)
+        self.drawData = (self.interpData, x, y, (config["xOffset"], config["yOffset"]), None)
 
-        # Add Offsets
-        x = x + self.config["xOffset"]
-        y = y + self.config["yOffset"]
+        if self.series.version() != version:
+            self.version += 1
+            self.dataUpdated = True
 
-        if dlg:
-            dlg += 10
-
-        self.modData = pd.DataFrame({'x': x, 'y': y})
+    def connectOffset(self, spinner, who):
+        spinner.valueChanged.connect(lambda value: self.__scrubOffset(spinner, value, who))
+        spinner.sigScrubFinished.connect(self.__finishDelta)
 
     def recalculate(self):
         raise NotImplementedError
@@ -160,45 +234,32 @@ class ListItem(QtWidgets.QWidget):
     def updateUI(self):
         raise NotImplementedError
 
-    def updatePlot(self):
-        # Calculate all colors
-        color = QtGui.QColor()
-        color.setHsvF(  self.config["color"][0] / 360,
-                        self.config["color"][1] / 100,
-                        self.config["color"][2] / 100)
-        pen = pg.mkPen(color=color, width=self.config["width"])
-
-        highlightColor = QtGui.QColor()
-        highlightColor.setHsvF( self.config["color"][0] / 360,
-                                self.config["color"][1] / 100,
-                                self.config["color"][2] / 100, 0.2)
-        highlightPen = pg.mkPen(color=highlightColor, width=self.config["width"] * 4 + 10)
+    # applies color, width, highlighting and z-index without touching the data
+    def updateStyle(self):
+        style = styles(tuple(self.config["color"]), self.config["width"])
 
         # set cursors
-        if self.config["cursorEnabled"]:
-            self.cursor.setPen(pg.mkPen(color=color, width=max(1, self.config["width"] / 2)))
-        else:
-            self.cursor.setPen(pg.mkPen(color=(0, 0, 0, 0), width=0))
+        cursorPen = style["cursorPen"] if self.config["cursorEnabled"] else style["hiddenPen"]
+        if cursorPen is not self.cursorPen:
+            self.cursorPen = cursorPen
+            self.cursor.setPen(cursorPen)
 
         # hide if not enabled
         if not self.config["enabled"]:
-            self.plot.setData(pen=None, symbolPen=None, symbolBrush=None, shadowPen=None)
+            self.plot.setStyle(pen=None, symbolPen=None, symbolBrush=None, shadowPen=None)
 
         else:
-            self.cursor.setZValue(self.config["zIndex"])
-
             # set to appropritae interpolation with respect to highlighting
             if self.config["interpolation"] == "keine":
                 if self.config["highlight"]:
-                    self.plot.setData(pen=None, symbolPen=pen, symbolBrush=highlightColor, shadowPen=None)
+                    self.plot.setStyle(pen=None, symbolPen=style["pen"], symbolBrush=style["highlightColor"], shadowPen=None)
                 else:
-                    self.plot.setData(pen=None, symbolPen=pen, symbolBrush=color, shadowPen=None)
+                    self.plot.setStyle(pen=None, symbolPen=style["pen"], symbolBrush=style["color"], shadowPen=None)
 
+            elif self.config["highlight"]:
+                self.plot.setStyle(pen=style["pen"], symbolPen=None, symbolBrush=None, shadowPen=style["highlightPen"])
             else:
-                self.plot.setData(pen=pen, symbolPen=None, symbolBrush=None, shadowPen=None)
-
-                if self.config["highlight"]:
-                    self.plot.setData(shadowPen=highlightPen)
+                self.plot.setStyle(pen=style["pen"], symbolPen=None, symbolBrush=None, shadowPen=None)
 
             # set respective z indecies
             if self.config["highlight"]:
@@ -208,14 +269,32 @@ class ListItem(QtWidgets.QWidget):
                 self.cursor.setZValue(self.config["zIndex"])
                 self.plot.setZValue(self.config["zIndex"])
 
-        # if self.dataUpdated:
-        # self.plot.setData(self.interpData["x"], self.interpData["y"])
-        if self.config["enabled"]:
-            self.plot.setDownsampleData(self.interpData["x"], self.interpData["y"])
+    def updatePlot(self):
+        self.updateStyle()
+
+        if self.interpData is None:
+            # still loading
+            self.plot.setDownsampleData(None, None)
+        elif self.config["enabled"]:
+            self.plot.setDownsampleData(*self.__drawnData())
         else:
-            self.plot.setDownsampleData([0, 0.001], [0, 0])
+            self.plot.setDownsampleData(*HIDDEN_DATA)
         self.dataUpdated = False
 
+    # draws the visible part of the data again after the view has changed
+    # series out of view or drawn for the same range are skipped by the plot itself
+    def updateView(self):
+        if self.config["enabled"] and self.interpData is not None:
+            self.plot.setDownsampleData(*self.__drawnData())
+
+    # arguments of the plot for the current interpData
+    # data that hasn't been calculated by the series, e.g. placeholders, is drawn as it is
+    def __drawnData(self):
+        mode = Decimation.choose(self.config)
+        if self.drawData is not None and self.drawData[0] is self.interpData:
+            return (self.drawData[1], self.drawData[2], mode) + self.drawData[3:]
+        return self.interpData["x"], self.interpData["y"], mode
+
     def update(self):
         self.recalculate()
         self.updatePlot()
@@ -242,6 +321,9 @@ class ListItem(QtWidgets.QWidget):
                 "background-color: hsv({:d},{:d}%,{:d}%); color: black;".format(
                     self.config["color"][0], self.config["color"][1], self.config["color"][2]))
         else:
+            # the offset spinners follow a running drag, which is only applied once it has finished
+            if self.pendingOffset and (who == "xOffset" or who == "yOffset"):
+                return
             self.config[who] = evt
 
         self.update()
@@ -251,7 +333,6 @@ class ListItem(QtWidgets.QWidget):
     def deselect(self):
         if self.config["highlight"] == True:
             self.setHighlight(False)
-            self.updatePlot()
 
     def getSelected(self):
         raise NotImplementedError
@@ -264,32 +345,39 @@ class ListItem(QtWidgets.QWidget):
 
     def updateCursor(self, mousePoint):
         infoText = ""
+        if self.interpData is None:
+            return infoText
+
         if self.config.get("enabled") or self.config.get("cursorEnabled"):
+            dx, dy = self.pendingOffset or (0.0, 0.0)
+
             # find nearest x-sample to mouse-x pos
             index = np.clip(
                 np.searchsorted(self.interpData["x"],
-                [mousePoint.x()])[0],
+                [mousePoint.x() - dx])[0],
                 0, len(self.interpData["y"]) - 1
             )
+            value = self.interpData["y"][index] + dy
 
             if self.config.get("cursorEnabled"):
-                self.cursor.setPos(self.interpData["y"][index])
+                self.cursor.setPos(value)
 
             infoText = "\t  <span style='color: hsv({:d},{:d}%,{:d}%);'>y={:5.3f}</span>".format(
                 self.config["color"][0],
                 self.config["color"][1],
                 self.config["color"][2],
-                self.interpData["y"][index])
+                value)
 
         return infoText
 
     def autoscale(self):
-        if self.config["enabled"]:
+        if self.config["enabled"] and self.interpData is not None:
+            dx, dy = self.pendingOffset or (0.0, 0.0)
             return {
-                "xmin": self.interpData["x"][0],
-                "xmax": self.interpData["x"][len(self.interpData["x"])-1],
-                "ymin": self.interpData["y"].min(),
-                "ymax": self.interpData["y"].max()
+                "xmin": self.interpData["x"][0] + dx,
+                "xmax": self.interpData["x"][len(self.interpData["x"])-1] + dx,
+                "ymin": self.interpData["y"].min() + dy,
+                "ymax": self.interpData["y"].max() + dy
             }
         else:
             return {
@@ -303,7 +391,7 @@ class ListItem(QtWidgets.QWidget):
         self.config["highlight"] = highlight
         if isinstance(self.plot, Graph.Graph):
             self.plot.setDraggable(highlight)
-        self.updatePlot()
+        self.updateStyle()
 
     def setEnabled(self, enabled):
         self.config["enabled"] = enabled
@@ -318,6 +406,7 @@ class ListItem(QtWidgets.QWidget):
 # https://stackoverflow.com/questions/20922836/increases-decreases-qspinbox-value-when-click-drag-mouse-python-pyside
 class SuperSpinner(QtWidgets.QLineEdit):
     valueChanged = QtCore.pyqtSignal("float")
+    sigScrubFinished = QtCore.pyqtSignal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -334,6 +423,13 @@ class SuperSpinner(QtWidgets.QLineEdit):
         self.min = self.max = 0.0
         self.setValue(0.0, True)
 
+        # while dragging the value is emitted at most once per frame
+        self.scrubbing = False
+        self.frameTimer = QtCore.QTimer()
+        self.frameTimer.setSingleShot(True)
+        self.frameTimer.setInterval(int(1000 / Config.FRAME_RATE))
+        self.frameTimer.timeout.connect(lambda: self.valueChanged.emit(self.value))
+
     def __handleChange(self):
         t = self.text()
         if (self.beeingEdited or self.mouseStartPos) and t and float(t):
@@ -384,11 +480,20 @@ class SuperSpinner(QtWidgets.QLineEdit):
             value = min((self.max, max((self.min, value))))
             self.value = value
             self.setText(str(value))
-            self.valueChanged.emit(self.value)
+
+            self.scrubbing = True
+            if not self.frameTimer.isActive():
+                self.frameTimer.start()
 
     def mouseReleaseEvent(self, e):
         super().mouseReleaseEvent(e)
         self.mouseStartPos = False
+
+        if self.scrubbing:
+            self.frameTimer.stop()
+            self.valueChanged.emit(self.value)
+            self.scrubbing = False
+            self.sigScrubFinished.emit()
         # self.unsetCursor()
 
     def toDict(self):
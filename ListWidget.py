@@ -33,6 +33,7 @@ class DeselectableListWidget(QtWidgets.QListWidget):
         self.itemClicked.connect(self.activateSelected)
 
     def addItem(self, li):
+        li.container = self
         li.sigUpdateUI.connect(self.sigUpdateUI.emit)
         li.sigCalc.connect(self.sigCalc.emit)
 
@@ -43,6 +44,21 @@ class DeselectableListWidget(QtWidgets.QListWidget):
         self.sigUpdateUI.emit()
         self.sigCalc.emit()
 
+    # adds several items at once, dependents are only notified once
+    def addItems(self, lis):
+        for li in lis:
+            li.container = self
+            li.sigUpdateUI.connect(self.sigUpdateUI.emit)
+            li.sigCalc.connect(self.sigCalc.emit)
+
+            self.list.append(li)
+            super().addItem(li.item)
+            super().setItemWidget(li.item, li.frame)
+
+        if lis:
+            self.sigUpdateUI.emit()
+            self.sigCalc.emit()
+
     def deleteSelected(self, plot, selected=None):
         # get selected item of this list
         if selected == None:
@@ -74,7 +90,6 @@ class DeselectableListWidget(QtWidgets.QListWidget):
         for item in self.list:
             if item.item == current:
                 item.setHighlight(True)
-                item.updatePlot()
                 return
 
     def deselectAll(self):
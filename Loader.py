@@ -0,0 +1,176 @@
+# Loader.py
+# by Robin Prillwitz
+# 18.10.2026
+#
+
+import os
+import re
+import multiprocessing
+from concurrent import futures
+
+import numpy as np
+from PyQt5 import QtCore
+
+import Cache
+import Config
+import Ingest
+import Pipeline
+import Storage
+
+
+# storage types of the selected columns
+# x always stays float64, y is stored with the precision of the item
+def columnTypes(config):
+    dtypes = {config["yColumn"]: np.dtype(config.get("precision", Config.DTYPE))}
+    dtypes[config["xColumn"]] = np.dtype(np.float64)
+    return dtypes
+
+# loads the selected columns of a file and runs the first calculation on them
+# returns everything a DataFile needs to display itself
+def load(filename, config, progress=None):
+    columns = [config["xColumn"], config["yColumn"]]
+    dtypes = columnTypes(config)
+
+    # a followed file is still being written, the cache would be outdated immediately
+    # only complete lines are read, the rest is picked up by the next tail update
+    follow = config.get("follow", False) and not Ingest.isCompressed(filename)
+    end = Ingest.completeLength(filename) if follow else os.path.getsize(filename)
+
+    data = None if follow else Cache.load(filename, columns, config["seperator"], config["decimal"], dtypes)
+    if data is not None:
+        data = Storage.ColumnStore(data)
+    else:
+        data = Ingest.readColumns(filename, columns,
+                sep=config["seperator"], decimal=config["decimal"], progress=progress,
+                limit=end if follow else None, dtypes=dtypes)
+        data = Storage.mapColumns(filename, data, config["seperator"], config["decimal"], cache=not follow)
+
+    # known from the cache unless the file is followed
+    isSorted = None if follow else Cache.isSorted(filename, config["xColumn"], config["seperator"], config["decimal"])
+    if isSorted is None:
+        x = data[config["xColumn"]]
+        isSorted = bool(np.all(x[1:] >= x[:-1]))
+
+    series = Pipeline.ColumnSeries(data)
+
+    return {
+        "data": data,
+        "end": end,
+        "sorted": isSorted,
+        "series": series,
+        "modData": series.modData(config),
+        "interpData": series.interpData(config)
+    }
+
+
+# parses a column mapping like "x = Zeit, y = Messung"
+# returns the x and y column or None if the text doesn't match
+def parseMapping(text):
+    match = re.fullmatch(r"\s*x\s*=\s*(.+?)\s*,\s*y\s*=\s*(.+?)\s*", text)
+    if not match:
+        return None
+    return match.group(1), match.group(2)
+
+# loads one file of a batch, runs in a worker process
+# seperator and decimal point are detected per file
+def loadBatchFile(filename, config):
+    head = Ingest.readHead(filename)
+
+    config = dict(config)
+    config["seperator"], config["decimal"] = Ingest.sniff(head)
+
+    header = Ingest.readPreview(head, sep=config["seperator"], decimal=config["decimal"]).columns.values.tolist()
+    for column in (config["xColumn"], config["yColumn"]):
+        if column not in header:
+            raise ValueError("Spalte \"{}\" nicht gefunden".format(column))
+
+    result = load(filename, config)
+    if not result["sorted"]:
+        raise ValueError("Unsortierte x-Achse")
+
+    # results that are just the loaded columns are built again by the GUI from its own data,
+    # only actual calculations are sent back through the pipe
+    data = result["data"]
+    for key in ("modData", "interpData"):
+        if (np.may_share_memory(result[key]["x"], data[config["xColumn"]]) and
+                np.may_share_memory(result[key]["y"], data[config["yColumn"]])):
+            result[key] = None
+
+    # cached columns are mapped again by the GUI instead of being sent through a pipe
+    if Cache.load(filename, [config["xColumn"], config["yColumn"]],
+            config["seperator"], config["decimal"], columnTypes(config)) is not None:
+        result["data"] = None
+
+    # the series refers to the data of this process, it is built again by the GUI
+    del result["series"]
+
+    result["config"] = config
+    return result
+
+# loads many files with the same column mapping on a process pool
+# returns the results and error messages, both keyed by filename
+def loadBatch(filenames, config, progress=None):
+    results = {}
+    errors = {}
+
+    # the workers are started fresh instead of forking the GUI, whose threads may be running
+    context = multiprocessing.get_context("spawn")
+
+    with futures.ProcessPoolExecutor(max_workers=Config.WORKERS, mp_context=context) as pool:
+        jobs = {pool.submit(loadBatchFile, filename, config): filename for filename in filenames}
+
+        for done, job in enumerate(futures.as_completed(jobs)):
+            try:
+                result = job.result()
+                if result["data"] is None:
+                    cfg = result["config"]
+                    mapped = Cache.load(jobs[job], [cfg["xColumn"], cfg["yColumn"]],
+                            cfg["seperator"], cfg["decimal"], columnTypes(cfg))
+                    if mapped is None:
+                        raise ValueError("Datei wurde während des Imports verändert")
+                    result["data"] = Storage.ColumnStore(mapped)
+
+                series = Pipeline.ColumnSeries(result["data"])
+                if result["modData"] is None:
+                    result["modData"] = series.modData(result["config"])
+                if result["interpData"] is None:
+                    result["interpData"] = series.interpData(result["config"])
+                result["series"] = series
+                results[jobs[job]] = result
+            except Exception as e:
+                errors[jobs[job]] = str(e)
+
+            if progress:
+                progress((done + 1) / len(jobs))
+
+    return results, errors
+
+
+class LoadSignals(QtCore.QObject):
+    sigProgress = QtCore.pyqtSignal(int)
+    sigFinished = QtCore.pyqtSignal(object)
+    sigError = QtCore.pyqtSignal(str)
+
+
+# runs load() on the global thread pool
+# results are delivered through queued signals into the GUI thread
+class LoadWorker(QtCore.QRunnable):
+    def __init__(self, filename, config):
+        super().__init__()
+        self.filename = filename
+        self.config = dict(config)
+        self.signals = LoadSignals()
+
+    def run(self):
+        try:
+            result = load(self.filename, self.config,
+                    progress=lambda p: self.signals.sigProgress.emit(int(p * 100)))
+        except Exception as e:
+            self.signals.sigError.emit(str(e))
+            return
+
+        self.signals.sigFinished.emit(result)
+
+
+def start(worker):
+    QtCore.QThreadPool.globalInstance().start(worker)
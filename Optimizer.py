@@ -6,6 +6,7 @@
 import Config
 import Process
 import Cursor
+import Scheduler
 import numpy as np
 import pandas as pd
 import pyqtgraph as pg
@@ -74,6 +75,7 @@ def __error(compound, limit):
 def __doOptimization(compound_data, s):
     compound_data.fileList.list[0].config["xOffset"] += s
     compound_data.fileList.list[0].update()
+    Scheduler.flush()
     QtTest.QTest.qWait(5)
 
 def optimizeTime(lst):
@@ -148,6 +150,7 @@ def optimizeTime(lst):
     for i, val in enumerate(x):
         compound_data.fileList.list[0].config["xOffset"] = val
         compound_data.fileList.list[0].update()
+        Scheduler.flush()
         y[i] = abs(__error(compound_data.interpData, maxLimit))
 
         if i % increment == 0:
@@ -165,6 +168,7 @@ def optimizeTime(lst):
     # set result
     compound_data.fileList.list[0].config["xOffset"] = x[minIdx]
     compound_data.fileList.list[0].update()
+    Scheduler.flush()
 
     dlg.setValue(99)
     info.addItem("Abgeschlossen")
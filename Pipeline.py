@@ -0,0 +1,630 @@
+# Pipeline.py
+# by Robin Prillwitz
+# 18.10.2026
+#
+
+import itertools
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent import futures
+
+import numpy as np
+from scipy.interpolate import interp1d
+
+import Config
+import Filter
+
+# The calculations of a single data series.
+# Kept free of any Qt objects, so they can run outside of the GUI thread.
+
+# storage type of y values, x always stays float64
+def valueType(config):
+    return np.dtype(config.get("precision", Config.DTYPE))
+
+# areas of all intervals between the samples, in float64
+# "simpson" integrates every interval over the parabola through its neighbouring samples,
+# which is exact for quadratic data on any spacing, "trapez" connects the samples linearly
+# the area of an interval only depends on the samples up to its end, so appending samples doesn't change it
+def integralAreas(x, y, method=None):
+    method = method or Config.INTEGRATION
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    h = np.diff(x)
+
+    if method == "simpson" and len(y) >= 3:
+        # parabola through the samples i-1, i, i+1 for every interval [i, i+1]
+        # with t = x - x[i]: p(t) = y[i] + b t + c t^2
+        h0 = h[:-1]
+        h1 = h[1:]
+        y0 = y[:-2]
+        y1 = y[1:-1]
+        y2 = y[2:]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            c = ((y2 - y1) / h1 + (y0 - y1) / h0) / (h0 + h1)
+            b = (y2 - y1) / h1 - c * h1
+
+        areas = np.empty(len(h), dtype=np.float64)
+        # intervals 1..n-1 use the right half of their parabola
+        areas[1:] = y1 * h1 + b * h1**2 / 2 + c * h1**3 / 3
+        # the first interval uses the left half of the first parabola
+        areas[0] = y1[0] * h0[0] - b[0] * h0[0]**2 / 2 + c[0] * h0[0]**3 / 3
+
+        # repeated x values have no width, fall back to the trapezoid there
+        invalid = ~np.isfinite(areas)
+        trapez = h * (y[1:] + y[:-1]) / 2
+        areas[invalid] = trapez[invalid]
+        return areas
+
+    return h * (y[1:] + y[:-1]) / 2
+
+# cumulative integral over the actual x spacing, starting at 0 on the first sample
+# the sum is accumulated in float64 and only the result has the type of y,
+# a float32 sum loses most of its precision over millions of samples
+def cumulativeIntegral(x, y, method=None):
+    result = np.zeros(len(y), dtype=np.float64)
+    if len(y) >= 2:
+        np.cumsum(integralAreas(x, y, method), out=result[1:])
+    return result.astype(np.result_type(y.dtype, np.float32), copy=False)
+
+# derivative over the actual x spacing
+# repeated x values make the spacing ambiguous, then the mean spacing is used
+def derivative(x, y):
+    if len(y) < 2:
+        return np.zeros_like(y)
+
+    if np.all(np.diff(x) > 0):
+        return np.gradient(y, x).astype(y.dtype, copy=False)
+
+    return np.gradient(y, (x[-1] - x[0]) / (len(x) - 1)).astype(y.dtype, copy=False)
+
+# smoothing, sigma in samples
+def applyFilter(x, y, config):
+    if config["filter"] > 0:
+        y = Filter.apply(y, config["filter"], config.get("filterType", "Gauß"))
+    return x, y
+
+# numeric integration / differential
+def applyIntegration(x, y, config):
+    if config["integrate"] > 0:
+        for i in range(config["integrate"]):
+            y = cumulativeIntegral(x, y).astype(y.dtype, copy=False)
+    elif config["integrate"] < 0:
+        for i in range(abs(config["integrate"])):
+            y = derivative(x, y)
+    return x, y
+
+def applyOffsets(x, y, config):
+    x = x + config["xOffset"]
+    y = (y + config["yOffset"]).astype(valueType(config), copy=False)
+    return x, y
+
+# applies filter, integration / differentiation and offsets
+def calculateCommon(x, y, config, dlg=None):
+    x = np.array(x, dtype=np.float64)
+    y = np.array(y, dtype=valueType(config))
+
+    if dlg:
+        dlg += 10
+
+    x, y = applyFilter(x, y, config)
+
+    if dlg:
+        dlg += 5
+
+    x, y = applyIntegration(x, y, config)
+
+    if dlg:
+        dlg += 5
+
+    x, y = applyOffsets(x, y, config)
+
+    if dlg:
+        dlg += 10
+
+    return x, y
+
+# amount of samples of the regular grid for x, at most Config.MAX
+def gridSize(x):
+    return int(min([max([
+        np.ceil(((x.max() - x.min()) / Config.DIVISION) * Config.PPD),
+        Config.PPD,
+        len(x)
+    ]), Config.MAX]))
+
+# resamples the data onto a regular grid for all spline based interpolations
+def interpolate(x, y, config, dlg=None):
+    if config["interpolation"] == "keine" or config["interpolation"] == "linear":
+        return x, y
+
+    # generate common x samples
+    xnew = np.linspace(
+        x.min(), # from
+        x.max(), # to
+        gridSize(x)
+    )
+
+    if dlg:
+        dlg += 10
+    spl = interp1d(x, y, kind=config["interpolation"], copy=False,
+            assume_sorted=True, bounds_error=False, fill_value=0)
+    if dlg:
+        dlg += 10
+    y = spl(xnew).astype(y.dtype, copy=False)
+    x = xnew
+    if dlg:
+        dlg += 10
+
+    return x, y
+
+# grids a Process can resample its children onto
+GRIDS = ["gleichmäßig", "Stützstellen", "adaptiv"]
+
+# common grid for the sample positions of several series
+# "gleichmäßig" spaces as many samples as the longest series evenly over the whole range
+# "Stützstellen" uses every sample position of every series
+# "adaptiv" splits the range into regions, each sampled as densely as the densest series in it
+# both non-uniform grids are limited to Config.GRID_MAX samples
+def commonGrid(xs, mode="gleichmäßig"):
+    start = min(x[0] for x in xs)
+    end = max(x[-1] for x in xs)
+
+    if mode == "Stützstellen":
+        x = np.unique(np.concatenate(xs))
+        if len(x) <= Config.GRID_MAX:
+            return x
+        mode = "adaptiv"
+
+    if mode != "adaptiv" or end <= start:
+        return np.linspace(start, end, max(len(x) for x in xs))
+
+    edges = np.linspace(start, end, Config.GRID_REGIONS + 1)
+    counts = np.max([np.histogram(x, bins=edges)[0] for x in xs], axis=0)
+
+    # at least the region borders, and never more than the limit
+    counts = np.maximum(counts, 1)
+    if counts.sum() > Config.GRID_MAX:
+        counts = np.maximum((counts * (Config.GRID_MAX / counts.sum())).astype(np.int64), 1)
+
+    # counts[i] evenly spaced samples from the left border of every region
+    region = np.repeat(np.arange(len(counts)), counts)
+    step = np.arange(len(region)) - np.repeat(np.cumsum(counts) - counts, counts)
+    x = edges[region] + step / counts[region] * (edges[1] - edges[0])
+
+    return np.append(x, end)
+
+# operations a Process combines its children with
+OPERATIONS = {
+    "Addition": np.add,
+    "Subtraktion": np.subtract,
+    "Multiplikation": np.multiply,
+    "Division": np.divide
+}
+
+# combines the values of one child into y in place
+# values is an array on the same grid or a scalar, e.g. for a cursor
+# samples of y that are still NaN take the values as they are
+def combine(y, values, operation):
+    seed = np.isnan(y)
+
+    function = OPERATIONS.get(operation)
+    if function is None:
+        y[:] = -1
+    else:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            function(y, values, out=y, casting="unsafe")
+
+    y[seed] = values[seed] if np.ndim(values) else values
+    return y
+
+__pool = None
+
+# thread pool shared by all calculations
+# numpy and scipy release the GIL for most of their work, so threads run in parallel
+def pool():
+    global __pool
+    if __pool is None:
+        __pool = futures.ThreadPoolExecutor(max_workers=Config.THREADS)
+    return __pool
+
+# calls all functions on the thread pool and returns their results in order
+def parallel(functions):
+    if len(functions) < 2:
+        return [f() for f in functions]
+    return list(pool().map(lambda f: f(), functions))
+
+# Combines the children of a Process and keeps their resampled values.
+# If only some children change, Addition, Subtraktion and Multiplikation
+# replace just their contributions in the result instead of combining everything again.
+class Combination:
+    def __init__(self):
+        self.x = None
+        self.dtype = None
+        self.operation = None
+        self.keys = ()
+        self.contributions = {}     # key -> (state, values on the grid)
+        self.aggregate = None
+        self.exact = False          # False if the aggregate had to be patched, e.g. NaNs replaced
+        self.updates = 0
+
+    # children is a list of (key, state, values) with values returning the resampled child
+    # values is only called for children whose state has changed, all of them in parallel
+    def combine(self, x, children, operation, dtype):
+        keys = tuple(key for key, state, values in children)
+        changed = [i for i, (key, state, values) in enumerate(children)
+                if key not in self.contributions or self.contributions[key][0] != state]
+
+        # on a different grid every child has to be resampled
+        if np.dtype(dtype) != self.dtype or not np.array_equal(x, self.x):
+            changed = list(range(len(children)))
+
+        old = {}
+        for i, values in zip(changed, parallel([children[i][2] for i in changed])):
+            key, state = children[i][:2]
+            old[i] = self.contributions.get(key, (None, None))[1]
+            self.contributions[key] = (state, values)
+
+        incremental = (self.exact
+                and np.dtype(dtype) == self.dtype and np.array_equal(x, self.x)
+                and keys == self.keys and operation == self.operation
+                and operation in ("Addition", "Subtraktion", "Multiplikation")
+                and len(changed) < len(children)
+                and self.updates < Config.RECOMBINE_INTERVAL)
+
+        if incremental:
+            for i in changed:
+                incremental = self.__replace(i == 0, old[i], self.contributions[children[i][0]][1], operation)
+                if not incremental:
+                    break
+
+        if incremental:
+            self.updates += 1
+        else:
+            self.__combineAll(len(x), children, operation, dtype)
+
+        self.x = x
+        self.dtype = np.dtype(dtype)
+        self.keys = keys
+        self.operation = operation
+
+        return self.aggregate.copy()
+
+    # swaps the contribution of one child, returns False if that isn't possible
+    def __replace(self, first, old, new, operation):
+        if not np.all(np.isfinite(new)):
+            return False
+
+        if operation == "Addition" or (operation == "Subtraktion" and first):
+            self.aggregate += new - old
+        elif operation == "Subtraktion":
+            self.aggregate -= new - old
+        else:
+            # a zero factor can't be divided out again
+            if not np.all(old != 0):
+                return False
+            self.aggregate /= old
+            self.aggregate *= new
+
+        return True
+
+    def __combineAll(self, length, children, operation, dtype):
+        contributions = {}
+        y = np.full(length, np.nan, dtype=dtype)
+
+        # all contributions are up to date at this point
+        for key, state, values in children:
+            contributions[key] = self.contributions[key]
+            combine(y, contributions[key][1], operation)
+
+        self.exact = not np.any(np.isnan(y)) and all(
+                np.all(np.isfinite(values)) for state, values in contributions.values())
+
+        # remove all remaining NANs
+        y[np.isnan(y)] = 0
+
+        self.contributions = contributions
+        self.aggregate = y
+        self.updates = 0
+
+# amount of samples at the end of a series that change when samples are appended
+# None if every sample can change
+def tailMargin(config):
+    margin = 1
+
+    if config["filter"] > 0:
+        reach = Filter.reach(config["filter"], config.get("filterType", "Gauß"))
+        if reach is None:
+            return None
+        margin += reach
+
+    # every derivative reaches one sample further
+    if config["integrate"] < 0:
+        margin += abs(config["integrate"])
+
+    return margin
+
+# recalculates only the end of a series after samples were appended to it
+# count is the length of the series before appending
+# state is what the previous call returned for the same series, None after a full calculation
+# returns the index from which on the result has changed, the new values from there and the state for the next call
+def calculateTail(x, y, config, count, state=None):
+    margin = tailMargin(config)
+
+    # on short series filter windows are clamped to the length, so every sample can change
+    if margin is not None and count <= 2 * margin:
+        margin = count
+
+    # filters running over the whole series have to be calculated again entirely
+    if margin is None:
+        x, y = calculateCommon(x, y, config)
+        return 0, x, y, None
+
+    if config["integrate"] > 0:
+        return integrateTail(x, y, config, count, margin, state)
+
+    start = max(0, count - margin)
+    begin = max(0, start - margin)
+
+    x, y = calculateCommon(x[begin:], y[begin:], config)
+    return start, x[start - begin:], y[start - begin:], None
+
+# continues the integrals of a series after samples were appended to it
+# an interval only depends on the samples up to its end, so every integral continues
+# from its last unchanged value with the areas of the changed intervals
+# the state holds the filtered values and the unrounded integrals from two samples before the next change on
+def integrateTail(x, y, config, count, margin, state):
+    dtype = valueType(config)
+    start = max(0, count - margin)
+
+    # without a state, e.g. right after a full calculation, everything is integrated once
+    # the intervals at start - 1 and start use the two samples before the change
+    base = start - 2 if state is not None and start - 2 >= max(state["base"], 1) else 0
+
+    # the filter needs its whole reach before the first changed sample
+    begin = max(0, base - margin)
+    x, values = applyFilter(np.array(x[begin:], dtype=np.float64), np.array(y[begin:], dtype=dtype), config)
+    x = x[base - begin:]
+    values = values[base - begin:]
+
+    if base:
+        unchanged = slice(base - state["base"], start - state["base"])
+        values = np.concatenate([state["levels"][0][unchanged], values[2:]])
+
+    levels = [values]
+    for i in range(config["integrate"]):
+        areas = integralAreas(x, values.astype(dtype, copy=False))
+        if base:
+            previous = state["levels"][i + 1][unchanged]
+            values = np.concatenate([previous, previous[-1] + np.cumsum(areas[1:])])
+        else:
+            values = np.zeros(len(x), dtype=np.float64)
+            np.cumsum(areas, out=values[1:])
+        levels.append(values)
+
+    # the next call changes at least from len(x) - margin on
+    keep = max(0, base + len(x) - margin - 2)
+    state = {"base": keep, "levels": [level[keep - base:] for level in levels]}
+
+    first = start if base else 0
+    x, y = applyOffsets(x[first - base:], values[first - base:].astype(dtype, copy=False), config)
+    return first, x, y, state
+
+# continues the interpolation grid over a recalculated tail
+# start is the first changed sample of x and y
+# returns the index into the old grid from which on it has to be replaced and the new values
+def interpolateTail(x, y, interpX, start, config):
+    if config["interpolation"] == "keine" or config["interpolation"] == "linear":
+        return start, x[start:], y[start:]
+
+    keep = int(np.searchsorted(interpX, x[start]))
+    if keep < 2:
+        x, y = interpolate(x, y, config)
+        return 0, x, y
+
+    # keep the spacing of the existing grid
+    step = (interpX[keep - 1] - interpX[0]) / (keep - 1)
+    first = interpX[keep - 1] + step
+    xnew = first + step * np.arange(max(int(np.floor((x[-1] - first) / step)) + 1, 0))
+
+    # the grid may not get finer than a full calculation, which stays below Config.MAX
+    # beyond that the whole series is resampled onto a new grid
+    if keep + len(xnew) > gridSize(x):
+        x, y = interpolate(x, y, config)
+        return 0, x, y
+
+    # the spline is only fit to the end of the series, with some context before the change
+    begin = max(0, start - Config.TAIL_CONTEXT)
+    spl = interp1d(x[begin:], y[begin:], kind=config["interpolation"], copy=False,
+            assume_sorted=True, bounds_error=False, fill_value=0)
+
+    return keep, xnew, spl(xnew).astype(y.dtype, copy=False)
+
+
+__interpolants = OrderedDict()
+__interpolantsSize = 0
+__forgotten = []
+__interpolantsLock = threading.Lock()
+
+# memory pinned by a spline, the data it was fit to and for spline kinds knots and coefficients of the same length
+def __interpolantSize(x, y, kind):
+    size = x.nbytes + y.nbytes
+    if kind not in ("linear", "slinear", "nearest", "previous", "next", "zero"):
+        size += x.nbytes + y.nbytes
+    return size
+
+def __dropInterpolant(key):
+    global __interpolantsSize
+    spl, size = __interpolants.pop(key)
+    __interpolantsSize -= size
+
+# fitted spline for the given data of a series, reused as long as the version of the series stays the same
+# fitting a new version drops the splines of the older ones,
+# beyond Config.INTERPOLANT_BYTES the least recently used splines are dropped
+def interpolant(series, version, x, y, kind):
+    global __interpolantsSize
+    key = (series, version, kind)
+
+    with __interpolantsLock:
+        entry = __interpolants.get(key)
+        if entry is not None:
+            __interpolants.move_to_end(key)
+            return entry[0]
+
+    # fitting runs outside of the lock, so several splines can be fit in parallel
+    spl = interp1d(x, y, kind=kind, copy=False, assume_sorted=True,
+            bounds_error=False, fill_value=0)
+
+    with __interpolantsLock:
+        forgotten = set()
+        while __forgotten:
+            forgotten.add(__forgotten.pop())
+
+        for old in [old for old in __interpolants
+                if old[0] in forgotten or (old[0] == series and old[1] != version)]:
+            __dropInterpolant(old)
+
+        if key in __interpolants:
+            __dropInterpolant(key)
+        size = __interpolantSize(x, y, kind)
+        __interpolants[key] = (spl, size)
+        __interpolantsSize += size
+
+        # the newest spline is kept even if it is larger than the limit on its own
+        while __interpolantsSize > Config.INTERPOLANT_BYTES and len(__interpolants) > 1:
+            __dropInterpolant(next(iter(__interpolants)))
+
+    return spl
+
+# marks the splines of a series that doesn't exist anymore, they are dropped with the next fit
+# called by the garbage collector, which may run while the lock is held, so the lock isn't taken here
+def forgetInterpolants(series):
+    __forgotten.append(series)
+
+
+# One cached step of a series.
+# A stage only runs again if its upstream result or one of the config keys it reads has changed.
+class Stage:
+    def __init__(self, function, keys=(), upstream=None, dependencies=None):
+        self.function = function            # (x, y, config) -> (x, y), x and y are None for sources
+        self.keys = keys                    # config keys the result depends on
+        self.upstream = upstream
+        self.dependencies = dependencies    # returns anything else the result depends on
+        self.fingerprint = None
+        self.result = None
+        self.version = 0                    # changes whenever the result changes
+
+    def invalidate(self):
+        self.fingerprint = None
+
+    def get(self, config):
+        x = y = None
+        fingerprint = [tuple(config.get(k) for k in self.keys)]
+
+        if self.upstream:
+            x, y = self.upstream.get(config)
+            fingerprint.append(self.upstream.version)
+        if self.dependencies:
+            fingerprint.append(self.dependencies())
+
+        if fingerprint != self.fingerprint:
+            self.result = self.function(x, y, config)
+            self.fingerprint = fingerprint
+            self.version += 1
+
+        return self.result
+
+
+# Adds the offsets to an upstream result.
+# x and y are cached separately, so moving a series along one axis costs a single vector add.
+class OffsetStage:
+    def __init__(self, upstream):
+        self.upstream = upstream
+        self.xFingerprint = self.yFingerprint = None
+        self.x = self.y = None
+        self.version = 0
+
+    def invalidate(self):
+        self.xFingerprint = self.yFingerprint = None
+
+    def get(self, config):
+        x, y = self.upstream.get(config)
+        changed = False
+
+        fingerprint = (self.upstream.version, config["xOffset"])
+        if fingerprint != self.xFingerprint:
+            self.x = x + config["xOffset"] if config["xOffset"] else x
+            self.xFingerprint = fingerprint
+            changed = True
+
+        fingerprint = (self.upstream.version, config["yOffset"])
+        if fingerprint != self.yFingerprint:
+            self.y = (y + config["yOffset"]).astype(y.dtype, copy=False) if config["yOffset"] else y
+            self.yFingerprint = fingerprint
+            changed = True
+
+        if changed:
+            self.version += 1
+
+        return self.x, self.y
+
+
+# The cached calculations of one item:
+# source -> filter -> integration -> offsets         = modData
+#                                 -> interpolation -> offsets = interpData
+# offsets commute with the interpolation, so moving a series never refits its spline
+class Series:
+    counter = itertools.count()
+
+    def __init__(self, source, keys=(), dependencies=None):
+        self.key = next(Series.counter)
+        # the splines of a series are of no use once it is gone, e.g. rebuilt for new data
+        weakref.finalize(self, forgetInterpolants, self.key)
+        self.source = Stage(source, keys, dependencies=dependencies)
+        self.filter = Stage(applyFilter, ("filter", "filterType"), self.source)
+        self.integral = Stage(applyIntegration, ("integrate",), self.filter)
+        self.interpolation = Stage(interpolate, ("interpolation",), self.integral)
+        self.modOffsets = OffsetStage(self.integral)
+        self.interpOffsets = OffsetStage(self.interpolation)
+
+    # the source data has changed, everything has to be recalculated
+    def invalidate(self):
+        self.source.invalidate()
+
+    def modData(self, config):
+        x, y = self.modOffsets.get(config)
+        return {'x': x, 'y': y}
+
+    def interpData(self, config):
+        x, y = self.interpOffsets.get(config)
+        return {'x': x, 'y': y}
+
+    # interpData before the offsets are added
+    def interpBase(self, config):
+        return self.interpolation.get(config)
+
+    def version(self):
+        return (self.modOffsets.version, self.interpOffsets.version)
+
+    # values of modData at the given positions, 0 outside of its range
+    # the spline is fit without offsets, so moving the series only moves the positions it is evaluated at
+    def resample(self, x, config, kind):
+        baseX, baseY = self.integral.get(config)
+        spl = interpolant(self.key, self.integral.version, baseX, baseY, kind)
+
+        x = x - config["xOffset"]
+        values = spl(x)
+        values[(x >= baseX[0]) & (x <= baseX[-1])] += config["yOffset"]
+        return values
+
+
+# series of the selected columns of a data file
+class ColumnSeries(Series):
+    def __init__(self, data):
+        self.data = data
+        super().__init__(self.__source, ("xColumn", "yColumn", "precision"))
+
+    def __source(self, x, y, config):
+        return (np.asarray(self.data[config["xColumn"]], dtype=np.float64),
+                np.asarray(self.data[config["yColumn"]], dtype=valueType(config)))
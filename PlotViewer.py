@@ -53,9 +53,8 @@ class PlotViewer:
         self.plt.addItem(item.plot)
         self.plt.addItem(item.cursor, ignoreBounds=True)
 
+        # clipping and decimation are done by the items themselves
         try:
-            item.plot.setData(clipToView=True)
-            item.plot.setData(autoDownsample=True, downsampleMethod="peak")
             item.updatePlot()
         except:
             pass
@@ -7,19 +7,20 @@ import os
 import sys
 import copy
 from pathlib import Path
-from PyQt5 import QtGui, QtCore, QtWidgets, QtTest
+from PyQt5 import QtGui, QtCore, QtWidgets
 import pyqtgraph as pg
 
 import pandas as pd
 import numpy as np
-from scipy import integrate
 from scipy.interpolate import interp1d
-from scipy.ndimage.filters import gaussian_filter1d
 
 import Config
+import Filter
 import Cursor
 import ListItem
 import ListWidget
+import Pipeline
+import Scheduler
 
 # Handles one data file and its processing
 # inherits from QWidget to emit signals
@@ -29,11 +30,14 @@ class Process(ListItem.ListItem):
         super().__init__(color, config=config, parent=parent)
 
         self.config["operation"] = "Addition"
+        self.config.setdefault("grid", "gleichmäßig")
 
         self.__initSettings()
         self.__showListItem()
 
         self.data = None
+        self.combination = Pipeline.Combination()
+        self.series = Pipeline.Series(self.__combine, ("operation", "grid", "precision"), self.__childVersions)
         self.recalculate()
         self.updatePlot()
 
@@ -103,7 +107,8 @@ class Process(ListItem.ListItem):
         self.fileList.setMinimumWidth(200)
 
         self.fileList.sigUpdateUI.connect(self.updateUI)
-        self.fileList.sigCalc.connect(self.update)
+        # changes of children are collected and recalculated once per event
+        self.fileList.sigCalc.connect(lambda: Scheduler.markDirty(self))
         self.Vlayout.addWidget(self.fileList)
 
         self.frame.setLayout(self.Vlayout)
@@ -116,114 +121,58 @@ class Process(ListItem.ListItem):
         if len(self.fileList.list) == 0:
             self.ignore = True
             self.config["cursorEnabled"] = False
-            self.modData = self.interpData = pd.DataFrame({'x': [0, 0.00001], 'y': [0, 0]})
+            self.modData = self.interpData = ListItem.placeholder(width=0.00001)
             return
         self.ignore = False
         self.config["cursorEnabled"] = True
 
-        # find entire range of all items
-        start = np.Inf
-        end =  -np.Inf
-        points = 0
+        if all(item.ignore for item in self.fileList.list):
+            return
 
-        dlg += 5
-        QtTest.QTest.qWait(20)
+        dlg += 10
 
-        for index, item in enumerate(self.fileList.list):
-            dlg += 1
-            if item.ignore:
-                break
+        # the children are only combined again if one of them has changed
+        # filter, integration and offsets are cached separately
+        self.calculateSeries()
 
-            imin = item.interpData["x"].min()
-            imax = item.interpData["x"].max()
-            pts = len(item.interpData["x"])
+        dlg.setValue(100)
+        if self.sigCalc:
+            self.sigCalc.emit()
 
-            if imin < start:
-                start = imin
-            if imax > end:
-                end = imax
-            if pts > points:
-                points = pts
+    # state of the children the combination depends on
+    def __childVersions(self):
+        return tuple((item.uid, item.version, item.ignore) for item in self.fileList.list)
 
-        dlg += 5
+    # combines all children on a common grid
+    def __combine(self, x, y, config):
+        # sample positions of all items
+        x = Pipeline.commonGrid([np.asarray(item.interpData["x"]) for item in self.fileList.list
+                if not item.ignore], config["grid"])
 
-        if start == np.Inf or end == -np.Inf:
-            return
+        children = [(item.uid, item.version, lambda item=item: self.__resample(item, x))
+                for item in self.fileList.list if not item.ignore]
 
-        # generate x points in range
-        x = np.linspace(
-            start,
-            end,
-            points
-        )
-        y = np.full(len(x), np.nan)
+        return x, self.combination.combine(x, children, config["operation"], config["precision"])
 
-        dlg += 5
-        QtTest.QTest.qWait(20)
+    # values of a child on the common grid
+    def __resample(self, item, x):
+        if isinstance(item, Cursor.Cursor):
+            return item.config["yOffset"]
 
-        for item in self.fileList.list:
-            dlg += 1
-            if item.ignore:
-                break
-
-            if isinstance(item, Cursor.Cursor):
-                 values = np.full(len(x), item.config["yOffset"])
-            else:
-                if item.config["interpolation"] == "keine" or item.config["interpolation"] == "linear":
-                    interpolation = "slinear"
-                else:
-                    interpolation = item.config["interpolation"]
-
-                dlg += 1
-                # create spline, ignoreing all out-of-range values
-                spl = interp1d(item.modData["x"], item.modData["y"],
-                        kind=interpolation, copy=False, assume_sorted=True,
-                        bounds_error = False, fill_value=0)
-                dlg += 1
-                values = spl(x)
-
-            # apply Operation otherwise just add
-            dlg += 1
-            inc = 1 // (20 / len(x))
-            for i in range(len(x)):
-                if np.isnan(y[i]):
-                    y[i] = values[i]
-                else:
-                    y[i] = self.__doOperation(y[i], values[i])
-
-                if inc > 0 and i % inc == 0:
-                    dlg += 1
-
-        # remove all remaining NANs
-        y[np.isnan(y)] = 0
-        dlg += 5
-
-        # apply gaussian filter
-        if self.config["filter"] > 0:
-            y = gaussian_filter1d(y, sigma=self.config["filter"])
-        dlg += 5
-
-        # calculate numeric integration / differential
-        if self.config["integrate"] > 0:
-            for i in range(self.config["integrate"]):
-                for j, val in enumerate(x):
-                    y[j] = integrate.quad(lambda _: y[j], 0, val)[0]
-        elif self.config["integrate"] < 0:
-            for i in range(abs(self.config["integrate"])):
-                y = np.gradient(y, x[1] - x[0])
-
-        dlg += 5
-
-        # Add Offsets
-        x = x + self.config["xOffset"]
-        y = y + self.config["yOffset"]
-
-        # save data
-        self.interpData = {'x': x, 'y': y}
+        if item.config["interpolation"] == "keine" or item.config["interpolation"] == "linear":
+            interpolation = "slinear"
+        else:
+            interpolation = item.config["interpolation"]
 
-        dlg.setValue(100)
-        if self.sigCalc:
-            self.sigCalc.emit()
+        # the fitted spline is reused until the data of the item changes
+        if item.series is not None:
+            return item.series.resample(x, item.config, interpolation)
+
+        # create spline, ignoreing all out-of-range values
+        spl = interp1d(item.modData["x"], item.modData["y"],
+                kind=interpolation, copy=False, assume_sorted=True,
+                bounds_error = False, fill_value=0)
+        return spl(x)
 
     # from user Aguy at
     # https://stackoverflow.com/questions/48900977/find-all-indexes-of-a-numpy-array-closest-to-a-value
@@ -234,23 +183,16 @@ class Process(ListItem.ListItem):
         idx = np.sort(idx)
         return idx
 
-    def __doOperation(self, a, b):
-        if self.config["operation"] == "Addition":
-            return a + b
-        elif self.config["operation"] == "Subtraktion":
-            return a - b
-        elif self.config["operation"] == "Multiplikation":
-            return a * b
-        elif self.config["operation"] == "Division":
-            return a / b
-        else:
-            return -1
-
     def updatePlot(self):
         for item in self.fileList.list:
             item.updatePlot()
         return super().updatePlot()
 
+    def updateView(self):
+        for item in self.fileList.list:
+            item.updateView()
+        return super().updateView()
+
     # reflects updated values in the UI
     def updateUI(self):
         self.x_offset.setValue(self.config["xOffset"])
@@ -314,7 +256,7 @@ class Process(ListItem.ListItem):
 
         zIndex = self.fileList.setZIndex(zIndex - 1)
 
-        self.updatePlot()
+        self.updateStyle()
         return zIndex
 
     def __toggleSettings(self):
@@ -349,7 +291,7 @@ class Process(ListItem.ListItem):
         self.x_offset.setRange(-9999, 9999)
         self.x_offset.setValue(self.config["xOffset"])
         self.x_offset.setFixedWidth(75)
-        self.x_offset.valueChanged.connect(lambda x, who="xOffset": self.applyChange(x, who))
+        self.connectOffset(self.x_offset, "xOffset")
         self.x_offset_label = QtWidgets.QLabel("x-Offset:")
         self.x_offset_label.setBuddy(self.x_offset)
         self.x_offset_label.setAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
@@ -358,7 +300,7 @@ class Process(ListItem.ListItem):
         self.y_offset.setRange(-9999, 9999)
         self.y_offset.setValue(self.config["yOffset"])
         self.y_offset.setFixedWidth(75)
-        self.y_offset.valueChanged.connect(lambda y, who="yOffset": self.applyChange(y, who))
+        self.connectOffset(self.y_offset, "yOffset")
         self.y_offset_label = QtWidgets.QLabel("y-Offset:")
         self.y_offset_label.setBuddy(self.y_offset)
         self.y_offset_label.setAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
@@ -400,6 +342,33 @@ class Process(ListItem.ListItem):
         self.filterLabel.setBuddy(self.integrationBox)
         self.filterLabel.setAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
 
+        # Filter kernel
+        self.filterTypeBox = QtWidgets.QComboBox()
+        self.filterTypeBox.addItems(list(Filter.FILTERS.keys()))
+        self.filterTypeBox.setCurrentText(self.config["filterType"])
+        self.filterTypeBox.currentTextChanged.connect(lambda x, who="filterType": self.applyChange(x, who))
+        self.filterTypeLabel = QtWidgets.QLabel("Filterart:")
+        self.filterTypeLabel.setBuddy(self.filterTypeBox)
+        self.filterTypeLabel.setAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+
+        # Precision
+        self.precisionBox = QtWidgets.QComboBox()
+        self.precisionBox.addItems(["float64", "float32"])
+        self.precisionBox.setCurrentText(self.config["precision"])
+        self.precisionBox.currentTextChanged.connect(lambda x, who="precision": self.applyChange(x, who))
+        self.precisionLabel = QtWidgets.QLabel("Genauigkeit:")
+        self.precisionLabel.setBuddy(self.precisionBox)
+        self.precisionLabel.setAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+
+        # Grid
+        self.gridBox = QtWidgets.QComboBox()
+        self.gridBox.addItems(Pipeline.GRIDS)
+        self.gridBox.setCurrentText(self.config["grid"])
+        self.gridBox.currentTextChanged.connect(lambda x, who="grid": self.applyChange(x, who))
+        self.gridLabel = QtWidgets.QLabel("Raster:")
+        self.gridLabel.setBuddy(self.gridBox)
+        self.gridLabel.setAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+
         self.GLayout.addWidget(self.x_offset_label,              0, 0)
         self.GLayout.addWidget(self.x_offset,                    0, 1)
         self.GLayout.addWidget(self.y_offset_label,              1, 0)
@@ -413,9 +382,17 @@ class Process(ListItem.ListItem):
 
         self.GLayout.addWidget(self.filterLabel,                 4, 0)
         self.GLayout.addWidget(self.filterBox,                   4, 1)
+        self.GLayout.addWidget(self.filterTypeLabel,             5, 0)
+        self.GLayout.addWidget(self.filterTypeBox,               5, 1)
+
+        self.GLayout.addWidget(self.integrationLabel,            6, 0)
+        self.GLayout.addWidget(self.integrationBox,              6, 1)
+
+        self.GLayout.addWidget(self.precisionLabel,              7, 0)
+        self.GLayout.addWidget(self.precisionBox,                7, 1)
 
-        self.GLayout.addWidget(self.integrationLabel,            5, 0)
-        self.GLayout.addWidget(self.integrationBox,              5, 1)
+        self.GLayout.addWidget(self.gridLabel,                   8, 0)
+        self.GLayout.addWidget(self.gridBox,                     8, 1)
 
         self.settings.setLayout(self.GLayout)
 
@@ -424,7 +401,7 @@ class Process(ListItem.ListItem):
             "type": "process",
             "containing": {
                 "config": self.config,
-                "data": self.modData.to_dict(),
+                "data": pd.DataFrame(self.modData).to_dict(),
                 "children": []
             }
         }
@@ -0,0 +1,102 @@
+# Pyramid.py
+# by Robin Prillwitz
+# 18.10.2026
+#
+
+import numpy as np
+
+import Config
+import Ingest
+
+
+# Min/max envelopes of a series at several resolutions, like the mipmaps of a texture.
+# Level k holds the minimum and maximum of every Config.PYRAMID_FACTOR^k samples,
+# so any range can be drawn from the coarsest level that still has enough buckets,
+# in time proportional to the amount of pixels instead of the amount of samples.
+class Pyramid:
+    def __init__(self, x, y, factor=None):
+        self.factor = max(int(factor or Config.PYRAMID_FACTOR), 2)
+
+        # (bucket size, minima, maxima) in growable buffers, finest first
+        self.levels = []
+
+        self.extend(x, y)
+
+    def __len__(self):
+        return len(self.x)
+
+    # takes over new data whose samples before start are the same as before, e.g. after appending to it
+    # only the buckets from the first changed one on are reduced again, the others are kept
+    def extend(self, x, y, start=0):
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+
+        # without common samples, or with a different type, everything is reduced again
+        if start <= 0 or any(levelMins.array.dtype != self.y.dtype for _, levelMins, _ in self.levels):
+            self.levels = []
+
+        level = 0
+        first = max(int(start), 0)
+        size = 1
+        mins = maxs = self.y
+        while len(mins) > 1:
+            # the first changed bucket, which starts at begin in the level below
+            first //= self.factor
+            if level >= len(self.levels) or first > self.levels[level][1].size:
+                first = 0
+                del self.levels[level:]
+                self.levels.append((size * self.factor,
+                        Ingest.ColumnBuffer(-(-len(mins) // self.factor), self.y.dtype),
+                        Ingest.ColumnBuffer(-(-len(mins) // self.factor), self.y.dtype)))
+
+            begin = first * self.factor
+            size, bufferMins, bufferMaxs = self.levels[level]
+            bufferMins.truncate(first)
+            bufferMins.extend(self.__reduce(mins[begin:], self.factor, np.minimum))
+            bufferMaxs.truncate(first)
+            bufferMaxs.extend(self.__reduce(maxs[begin:], self.factor, np.maximum))
+
+            mins = bufferMins.view()
+            maxs = bufferMaxs.view()
+            level += 1
+
+        del self.levels[level:]
+
+    # combines every n values, the remaining values form a shorter last bucket
+    @staticmethod
+    def __reduce(values, n, function):
+        end = (len(values) // n) * n
+        reduced = function.reduce(values[:end].reshape(-1, n), axis=1)
+        if end < len(values):
+            reduced = np.append(reduced, function.reduce(values[end:]))
+        return reduced
+
+    # envelope of the samples start to stop with at most about limit buckets
+    # returns x and y with alternating minima and maxima, or the samples themselves if they fit
+    def query(self, start, stop, limit):
+        count = stop - start
+        if count <= limit:
+            return self.x[start:stop], self.y[start:stop]
+
+        # coarsest level that still has at least limit buckets in the range
+        size, mins, maxs = 1, self.y, self.y
+        for level, levelMins, levelMaxs in self.levels:
+            if count / level < limit:
+                break
+            size, mins, maxs = level, levelMins.view(), levelMaxs.view()
+
+        first = start // size
+        last = -(-stop // size)
+
+        # merge neighbouring buckets until at most limit are left
+        n = -(-(last - first) // limit)
+        mins = self.__reduce(mins[first:last], n, np.minimum)
+        maxs = self.__reduce(maxs[first:last], n, np.maximum)
+
+        # interleave min and max into plot data to preserve envelope shape
+        y = np.empty(len(mins) * 2, dtype=self.y.dtype)
+        y[0::2] = mins
+        y[1::2] = maxs
+        x = np.repeat(self.x[first * size:last * size:size * n], 2)
+
+        return x, y
@@ -0,0 +1,66 @@
+# Scheduler.py
+# by Robin Prillwitz
+# 18.10.2026
+#
+
+from PyQt5 import QtCore
+
+# Collects the items that have to be recalculated and recalculates each of them once,
+# after the current event has been handled.
+# Children are recalculated before their parents, so a Process sees all changes at once.
+
+class SchedulerSignals(QtCore.QObject):
+    # recalculations of the last flush
+    sigFlushed = QtCore.pyqtSignal(int)
+
+
+signals = SchedulerSignals()
+
+# recalculations since the start and during the last flush
+recomputes = 0
+lastRecomputes = 0
+
+__dirty = {}
+__scheduled = False
+
+# nesting depth of an item, top level items have depth 0
+def depth(item):
+    i = 0
+    container = getattr(item, "container", None)
+    while container is not None and container.parent is not None:
+        i += 1
+        container = getattr(container.parent, "container", None)
+    return i
+
+def markDirty(item):
+    global __scheduled
+    __dirty[item] = None
+
+    if not __scheduled:
+        __scheduled = True
+        QtCore.QTimer.singleShot(0, flush)
+
+# recalculates all dirty items, deepest first
+# items marked while flushing, e.g. the parents of recalculated items, are handled in the same flush
+# can be called directly by anything that needs up to date results immediately
+def flush():
+    global __scheduled, recomputes, lastRecomputes
+    __scheduled = False
+
+    count = 0
+    while __dirty:
+        item = max(__dirty, key=depth)
+        del __dirty[item]
+
+        # removed from its list in the meantime
+        container = getattr(item, "container", None)
+        if container is not None and item not in container.list:
+            continue
+
+        item.update()
+        count += 1
+
+    if count:
+        recomputes += count
+        lastRecomputes = count
+        signals.sigFlushed.emit(count)
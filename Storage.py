@@ -0,0 +1,84 @@
+# Storage.py
+# by Robin Prillwitz
+# 18.10.2026
+#
+
+import tempfile
+
+import pandas as pd
+import numpy as np
+
+import Cache
+import Config
+import Ingest
+
+
+# column storage of a data file
+# columns are memory mapped, so only the pages actually read are held in memory
+# appending to a column moves it into a growable buffer in memory
+class ColumnStore:
+    def __init__(self, columns=None):
+        self.__columns = dict(columns) if columns else {}
+        self.__buffers = {}
+
+    @classmethod
+    def fromFrame(cls, frame):
+        return cls({c: spill(frame[c].to_numpy()) for c in frame.columns})
+
+    def __getitem__(self, column):
+        return self.__columns[column]
+
+    def __contains__(self, column):
+        return column in self.__columns
+
+    def __len__(self):
+        return len(self.__columns)
+
+    @property
+    def columns(self):
+        return list(self.__columns.keys())
+
+    def append(self, columns):
+        for column, values in columns.items():
+            buffer = self.__buffers.get(column)
+            if buffer is None:
+                current = self.__columns[column]
+                buffer = Ingest.ColumnBuffer(len(current) * 1.5 + len(values), current.dtype)
+                buffer.extend(current)
+                self.__buffers[column] = buffer
+
+            buffer.extend(values)
+            self.__columns[column] = buffer.view()
+
+    # same layout as pandas.DataFrame.to_dict, used for embedding into save files
+    def to_dict(self):
+        return pd.DataFrame({c: np.asarray(v) for c, v in self.__columns.items()}).to_dict()
+
+
+# copies an array into an anonymous temporary file and maps it back
+# used whenever the cache can't hold a column
+def spill(values):
+    values = np.ascontiguousarray(values)
+    if values.size == 0 or values.dtype == object:
+        return values
+
+    with tempfile.TemporaryFile() as fh:
+        mapped = np.memmap(fh, dtype=values.dtype, mode="w+", shape=values.shape)
+        mapped[:] = values
+        mapped.flush()
+
+    return mapped
+
+# moves freshly parsed columns out of memory
+# the cached files are mapped if possible, temporary files otherwise
+def mapColumns(filename, data, sep=Config.SEPERATOR, decimal=Config.DECIMAL, cache=True):
+    mapped = None
+    if cache:
+        Cache.store(filename, data, sep, decimal)
+        mapped = Cache.load(filename, list(data.keys()), sep, decimal,
+                dtypes={c: v.dtype for c, v in data.items()})
+
+    if mapped is None:
+        mapped = {c: spill(v) for c, v in data.items()}
+
+    return ColumnStore(mapped)
@@ -0,0 +1,32 @@
+# test_Filter.py
+# by Robin Prillwitz
+# 18.10.2026
+#
+
+import numpy as np
+
+import Filter
+
+# series shorter than the filter window still get smoothed instead of coming back unchanged
+def test_shortSeries():
+    rng = np.random.default_rng(0)
+
+    for n in (3, 5, 8, 12):
+        y = np.linspace(0.0, 1.0, n) + rng.normal(0.0, 0.5, n)
+
+        for kind in ("Savitzky-Golay", "Butterworth"):
+            smoothed = Filter.apply(y, 10.0, kind)
+
+            assert smoothed.shape == y.shape
+            assert np.all(np.isfinite(smoothed))
+            assert not np.allclose(smoothed, y)
+            assert np.std(np.diff(smoothed)) < np.std(np.diff(y))
+
+# a clamped Savitzky-Golay window still keeps polynomials up to its order
+# only the middle sample sees no reflected padding when the window spans the whole series
+def test_shortSavitzkyGolayKeepsPolynomials():
+    x = np.linspace(-1.0, 1.0, 9)
+    y = 1.0 + x - 2.0 * x**2 + 0.5 * x**3
+
+    assert Filter.savgolWidth(10.0) > len(y)
+    assert np.isclose(Filter.savitzkyGolay(y, 10.0)[4], y[4])